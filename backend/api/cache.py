@@ -0,0 +1,153 @@
+"""
+HTTP caching for read-only risk endpoints.
+
+The processed store only changes when build_features runs, and every build
+stamps a dataset version into the manifest. Responses are therefore keyed
+on that version:
+
+- ETag is derived from the version (and the negotiated media type), so an
+  If-None-Match revalidation is answered with 304 before any work is done;
+- encoded bodies are kept in a byte-bounded LRU keyed by
+  (version, path, query, media type, content coding), so repeated polls of
+  the same URL skip filtering and encoding. Entries of older versions are
+  dropped as soon as a new version is seen.
+
+Bodies for clients that accept gzip are compressed once, when they are
+cached, and served with Content-Encoding set; the GZip middleware passes
+such responses through instead of compressing every hit again.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from backend.api.encoding import ARROW_STREAM, PARQUET, negotiate
+
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_ENTRY_BYTES = 32 * 1024 * 1024
+CACHE_CONTROL = "public, max-age=60"
+
+# Same cut-off and level as the GZip middleware in backend/main.py: level 5
+# keeps most of the size win of month-wide map payloads at a fraction of
+# level 9's CPU
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+
+MEDIA_TAGS = {ARROW_STREAM: "arrow", PARQUET: "parquet"}
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded response bodies, bounded by total size."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_entry_bytes=CACHE_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _reset(self, version):
+        self._entries.clear()
+        self._bytes = 0
+        self._version = version
+
+    def get(self, key):
+        with self._lock:
+            if key[0] != self._version:
+                self._reset(key[0])
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, media_type, headers):
+        size = len(body)
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key[0] != self._version:
+                self._reset(key[0])
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key)[0])
+            self._entries[key] = (body, media_type, headers)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._reset(None)
+
+
+response_cache = ResponseCache()
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+async def cached_response(request: Request, snapshot, build):
+    """
+    Serve a GET from the dataset-versioned cache.
+
+    304s and cache hits are answered on the event loop. On a miss `build`
+    runs in the threadpool and must return a Response; 200 responses
+    are stored (body, gzip-compressed if the client accepts it, media type
+    and X-* headers). Exceptions raised by
+    `build` (e.g. HTTPException) propagate uncached.
+    """
+    media_type = negotiate(request)
+    etag = f'W/"{snapshot.version[:20]}-{MEDIA_TAGS.get(media_type, "json")}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(snapshot.modified, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept, Accept-Encoding",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Stable sort keeps the order of repeated parameters (e.g. scenario columns)
+    query = tuple(sorted(request.query_params.multi_items(), key=lambda kv: kv[0]))
+    coding = "gzip" if "gzip" in request.headers.get("accept-encoding", "") else "identity"
+    key = (snapshot.version, request.url.path, query, media_type, coding)
+
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = await run_in_threadpool(_encode, build, coding)
+        if isinstance(entry, Response):
+            return entry
+        response_cache.put(key, *entry)
+
+    body, media_type, extra = entry
+    return Response(content=body, media_type=media_type, headers={**headers, **extra})
+
+
+def _encode(build, coding):
+    """Cache entry for build()'s response, compressed for gzip clients; non-200 responses are returned as is."""
+    response = build()
+    if response.status_code != 200:
+        return response
+    extra = {k: v for k, v in response.headers.items() if k.lower().startswith("x-")}
+    body = response.body
+    if coding == "gzip" and len(body) >= GZIP_MIN_SIZE:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        extra["Content-Encoding"] = "gzip"
+    return body, response.media_type, extra
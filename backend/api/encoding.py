@@ -0,0 +1,87 @@
+"""
+Response encoding for DataFrame-backed endpoints.
+
+JSON is produced by pandas' C encoder straight from the columns, so no
+per-row dict is built and FastAPI's jsonable_encoder is skipped. Two JSON
+shapes are offered:
+
+    records  [{"district": "A", "CIIM": 0.41}, ...]      (default)
+    columns  {"district": ["A", ...], "CIIM": [0.41, ...]}
+
+Clients that send `Accept: application/vnd.apache.arrow.stream` or
+`Accept: application/vnd.apache.parquet` get the frame as an Arrow IPC
+stream or a Parquet file instead. Compression happens in the response
+cache (backend/api/cache.py) or the GZip middleware in backend/main.py.
+"""
+import io
+from typing import Literal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import Request, Response
+
+JSON = "application/json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+Shape = Literal["records", "columns"]
+
+# Decimal places (not significant digits) written for floats. Stored
+# metrics carry at most 4 (CIIM) or 6 (coordinates) decimals and ratios are
+# rounded below 1e-10; more would print binary expansion noise
+# (123456.789 -> 123456.789000000004307) and inflate payloads
+DOUBLE_PRECISION = 10
+
+
+def _json_records(df):
+    return df.to_json(orient="records", double_precision=DOUBLE_PRECISION).encode()
+
+
+def _json_columns(df):
+    parts = [
+        f'"{col}":' + df[col].to_json(orient="values", double_precision=DOUBLE_PRECISION)
+        for col in df.columns
+    ]
+    return ("{" + ",".join(parts) + "}").encode()
+
+
+def _arrow_stream(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _parquet(df):
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+
+def negotiate(request: Request):
+    """Media type to respond with, from the request's Accept header."""
+    accept = request.headers.get("accept", "")
+    if ARROW_STREAM in accept:
+        return ARROW_STREAM
+    if PARQUET in accept:
+        return PARQUET
+    return JSON
+
+
+def frame_response(df, request: Request, shape: Shape = "records"):
+    """Encode `df` as JSON (records or columns), Arrow IPC or Parquet."""
+    media_type = negotiate(request)
+    df = df.reset_index(drop=True)
+
+    if media_type == ARROW_STREAM:
+        body = _arrow_stream(df)
+    elif media_type == PARQUET:
+        body = _parquet(df)
+    elif shape == "columns":
+        body = _json_columns(df)
+    else:
+        body = _json_records(df)
+
+    headers = {"Vary": "Accept", "X-Row-Count": str(len(df))}
+    return Response(content=body, media_type=media_type, headers=headers)
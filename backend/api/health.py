@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from backend.data_access.snapshot import snapshot_service
 
 router = APIRouter()
 
@@ -9,3 +12,23 @@ def health():
         "system": "Aadhaar CIIM Risk Engine",
         "version": "1.0"
     }
+
+
+@router.get("/health/live")
+def live():
+    # The process is up and serving; says nothing about the data
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+def ready():
+    # Ready once a snapshot is loaded and indexed; never triggers a load itself
+    snapshot = snapshot_service.current
+    if snapshot is None:
+        return JSONResponse(status_code=503, content={"status": "loading"})
+    return {
+        "status": "ready",
+        "dataset_version": snapshot.version,
+        "rows": len(snapshot.frame),
+        "load_seconds": round(snapshot.load_seconds, 3),
+    }
@@ -0,0 +1,161 @@
+"""
+Prometheus metrics for the risk API, in the plain-text exposition format.
+
+Request metrics are recorded by track_requests (an HTTP middleware) per
+route template, so /risk/district/{district} is one series rather than one
+per district. Snapshot, cache and memory figures are read at scrape time.
+"""
+import threading
+import time
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from backend.api.cache import response_cache
+from backend.data_access.snapshot import snapshot_service
+from ml.profiling import rss_bytes
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_format(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _format(bound))])} {count}")
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format(series[-2])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "risk_api_request_duration_seconds", "Request latency by route.", ["method", "route"]
+)
+REQUESTS = Counter("risk_api_requests_total", "Requests by route and status.", ["method", "route", "status"])
+ROWS_SERVED = Counter("risk_api_rows_served_total", "Data rows in response bodies.", ["route"])
+BYTES_SERVED = Counter("risk_api_response_bytes_total", "Response body bytes (after compression).", ["route"])
+
+
+def _route_label(request: Request):
+    """Matched route template with its router prefix, e.g. /api/v1/risk/district/{district}."""
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Included routers keep their own paths; the prefix is whatever precedes
+    # the template's segments in the request path
+    segments = request.url.path.rstrip("/").split("/")
+    depth = template.rstrip("/").count("/")
+    return "/".join(segments[:len(segments) - depth]) + template
+
+
+async def track_requests(request: Request, call_next):
+    """HTTP middleware: latency, status, rows and bytes per route template."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    path = _route_label(request)
+    REQUEST_LATENCY.observe(elapsed, method=request.method, route=path)
+    REQUESTS.inc(method=request.method, route=path, status=str(response.status_code))
+    if "x-row-count" in response.headers:
+        ROWS_SERVED.inc(int(response.headers["x-row-count"]), route=path)
+    if "content-length" in response.headers:
+        BYTES_SERVED.inc(int(response.headers["content-length"]), route=path)
+    return response
+
+
+def _sample(name, help, value, labels="", kind="gauge"):
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name}{labels} {_format(value)}"]
+
+
+def _collect():
+    lines = []
+    for metric in (REQUEST_LATENCY, REQUESTS, ROWS_SERVED, BYTES_SERVED):
+        lines += metric.render()
+
+    lines += _sample("risk_cache_hits_total", "Response cache hits.", response_cache.hits, kind="counter")
+    lines += _sample("risk_cache_misses_total", "Response cache misses.", response_cache.misses, kind="counter")
+    lines += _sample("risk_process_resident_memory_bytes", "Resident memory of the API process.", rss_bytes())
+    lines += _sample("risk_snapshot_loads_total", "Snapshot loads since start.", snapshot_service.loads, kind="counter")
+    lines += _sample(
+        "risk_snapshot_load_seconds_total", "Time spent loading snapshots.", snapshot_service.load_seconds_total,
+        kind="counter",
+    )
+
+    snapshot = snapshot_service.current
+    lines += _sample("risk_snapshot_ready", "1 once a snapshot is loaded and indexed.", int(snapshot is not None))
+    if snapshot is not None:
+        lines += _sample("risk_snapshot_load_seconds", "Duration of the last snapshot load.", snapshot.load_seconds)
+        lines += _sample("risk_snapshot_rows", "Pincode rows in the snapshot.", len(snapshot.frame))
+        lines += _sample("risk_snapshot_memory_bytes", "Approximate size of the snapshot.", snapshot.memory_bytes())
+        lines += _sample(
+            "risk_dataset_info", "Current dataset version.", 1, _labels(["version"], [snapshot.version])
+        )
+        lines += _sample(
+            "risk_dataset_modified_timestamp_seconds", "When the dataset version was written.", snapshot.modified
+        )
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(_collect(), media_type=CONTENT_TYPE)
@@ -0,0 +1,127 @@
+from typing import Literal, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from backend.api.cache import cached_response
+from backend.api.encoding import Shape, frame_response
+from backend.data_access.names import canonical_state, map_names
+from backend.data_access.snapshot import snapshot_service
+from ml.policy_rules import POLICY_DEFAULT, POLICY_RULES, policy_flags, resolve_thresholds
+from ml.rollups import LEVEL_KEYS, POLICY_SEVERITY
+
+router = APIRouter()
+
+# Rule inputs returned next to the stored and re-evaluated flags
+INPUT_FIELDS = ["CIIM", "child_bio_ratio", "bio_growth"]
+FLAGS = [POLICY_DEFAULT] + [label for label, _ in POLICY_RULES]
+POLICY_THRESHOLDS = ["emergency_ciim", "protect_children_ratio", "audit_growth"]
+
+
+def _evaluate(snapshot, date, level, state, thresholds):
+    """
+    Rows of `level` for a date with their stored policy_flag and the flag
+    under `thresholds`. Rollup rows carry their worst pincode flag, as the
+    build does.
+    """
+    rows = snapshot.frame.iloc[snapshot.positions(date, "pincode", state)]
+    flags = policy_flags(rows, thresholds)
+
+    if level == "pincode":
+        out = rows[["state", "district", "pincode"] + INPUT_FIELDS + ["policy_flag"]].copy()
+        out["policy_flag_evaluated"] = flags.to_numpy()
+        return out
+
+    keys = LEVEL_KEYS[level][1:]
+    severity = pd.Categorical(flags, categories=POLICY_SEVERITY).codes
+    # Rollup rows are keyed on the canonical state name
+    pincode_keys = rows[keys].assign(state=map_names(rows["state"], canonical_state))
+    worst = (
+        pd.DataFrame({k: pincode_keys[k].astype(str).to_numpy() for k in keys} | {"_severity": severity})
+        .groupby(keys, sort=False)["_severity"].max()
+        .reset_index()
+    )
+    frame, _ = snapshot.levels[level]
+    out = frame.iloc[snapshot.positions(date, level, state)][keys + INPUT_FIELDS + ["policy_flag"]]
+    merged = out.astype({k: str for k in keys}).merge(worst, on=keys, how="left")
+    out = out.copy()
+    severity = merged["_severity"].fillna(0).astype(int).clip(lower=0)
+    out["policy_flag_evaluated"] = np.asarray(POLICY_SEVERITY, dtype=object)[severity]
+    return out
+
+
+def _thresholds(*values):
+    return resolve_thresholds(dict(zip(POLICY_THRESHOLDS, values)))
+
+
+@router.get("/risk/policy")
+async def evaluate_policy(
+    request: Request,
+    date: str,
+    level: Literal["pincode", "district", "state"] = "district",
+    state: Optional[str] = None,
+    emergency_ciim: Optional[float] = None,
+    protect_children_ratio: Optional[float] = None,
+    audit_growth: Optional[float] = None,
+    changed_only: bool = False,
+    shape: Shape = "records",
+):
+    """
+    Re-evaluate policy flags for one date under alternative thresholds.
+
+    Thresholds left out keep their build-time values (ml/policy_rules.py).
+    Each row has the stored policy_flag and policy_flag_evaluated;
+    `changed_only` keeps rows where they differ. X-Total-Count is the
+    number of rows returned.
+    """
+    snapshot = await snapshot_service.aget()
+    if level not in snapshot.levels:
+        raise HTTPException(status_code=404, detail=f"No {level}-level rollup in the current dataset")
+    thresholds = _thresholds(emergency_ciim, protect_children_ratio, audit_growth)
+
+    def build():
+        df = _evaluate(snapshot, date, level, state, thresholds)
+        if changed_only:
+            df = df[df["policy_flag"].astype(str).to_numpy() != df["policy_flag_evaluated"].to_numpy()]
+        response = frame_response(df, request, shape)
+        response.headers["X-Total-Count"] = str(len(df))
+        return response
+
+    return await cached_response(request, snapshot, build)
+
+
+@router.get("/risk/policy/summary")
+async def policy_summary(
+    request: Request,
+    date: str,
+    level: Literal["pincode", "district", "state"] = "district",
+    state: Optional[str] = None,
+    emergency_ciim: Optional[float] = None,
+    protect_children_ratio: Optional[float] = None,
+    audit_growth: Optional[float] = None,
+):
+    """Flag counts for one date as stored and under alternative thresholds."""
+    snapshot = await snapshot_service.aget()
+    if level not in snapshot.levels:
+        raise HTTPException(status_code=404, detail=f"No {level}-level rollup in the current dataset")
+    thresholds = _thresholds(emergency_ciim, protect_children_ratio, audit_growth)
+
+    def build():
+        df = _evaluate(snapshot, date, level, state, thresholds)
+        stored = df["policy_flag"].astype(str).value_counts()
+        evaluated = df["policy_flag_evaluated"].value_counts()
+        return JSONResponse({
+            "date": date,
+            "level": level,
+            "thresholds": {name: thresholds[name] for name in POLICY_THRESHOLDS},
+            "rows": len(df),
+            "changed": int((df["policy_flag"].astype(str).to_numpy() != df["policy_flag_evaluated"].to_numpy()).sum()),
+            "counts": {
+                flag: {"stored": int(stored.get(flag, 0)), "evaluated": int(evaluated.get(flag, 0))}
+                for flag in FLAGS
+            },
+        })
+
+    return await cached_response(request, snapshot, build)
@@ -0,0 +1,129 @@
+"""
+Row selection for list endpoints: filters, projection, sorting and
+cursor pagination over a snapshot frame.
+
+Everything works on row positions and single columns, so only the page of
+rows and fields the caller asked for is materialized as a DataFrame.
+Invalid parameters raise ValueError; routes turn that into HTTP 400.
+"""
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+
+MAX_LIMIT = 10_000
+
+# History downsampling: name -> pandas period alias
+RESAMPLE_PERIODS = {"month": "M", "quarter": "Q", "year": "Y"}
+
+
+def parse_fields(fields, allowed):
+    """Comma-separated projection, validated against `allowed` (None -> all)."""
+    if not fields:
+        return list(allowed)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {unknown}; available: {list(allowed)}")
+    return wanted
+
+
+def parse_sort(sort, allowed):
+    """'CIIM desc' / 'CIIM asc' / 'CIIM' -> (column, ascending)."""
+    if not sort:
+        return None
+    parts = sort.split()
+    if len(parts) > 2 or (len(parts) == 2 and parts[1].lower() not in ("asc", "desc")):
+        raise ValueError(f"Invalid sort {sort!r}; expected '<field> [asc|desc]'")
+    if parts[0] not in allowed:
+        raise ValueError(f"Cannot sort by {parts[0]!r}; available: {list(allowed)}")
+    return parts[0], len(parts) == 1 or parts[1].lower() == "asc"
+
+
+def encode_cursor(version, offset):
+    raw = json.dumps({"v": version, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, version):
+    """Offset stored in `cursor`; ValueError if malformed or from another dataset version."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        offset = int(payload["o"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Malformed cursor")
+    if offset < 0:
+        raise ValueError("Malformed cursor")
+    if payload.get("v") != version:
+        raise ValueError("Cursor belongs to a previous dataset version; restart pagination")
+    return offset
+
+
+def select(frame, positions, policy_flag=None, min_ciim=None, max_ciim=None, sort=None):
+    """Filter and sort `positions` (row positions in `frame`) without materializing rows."""
+    if policy_flag:
+        values = frame["policy_flag"].to_numpy()[positions]
+        positions = positions[np.isin(values, policy_flag)]
+    if min_ciim is not None or max_ciim is not None:
+        ciim = frame["CIIM"].to_numpy()[positions]
+        keep = np.ones(len(positions), dtype=bool)
+        if min_ciim is not None:
+            keep &= ciim >= min_ciim
+        if max_ciim is not None:
+            keep &= ciim <= max_ciim
+        positions = positions[keep]
+    if sort is not None:
+        column, ascending = sort
+        key = frame[column].take(positions).reset_index(drop=True)
+        order = key.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def page(frame, positions, fields, version, limit=None, cursor=None):
+    """
+    Materialize one page of `fields` for `positions`.
+
+    Returns (DataFrame, next_cursor); next_cursor is None on the last page.
+    """
+    offset = decode_cursor(cursor, version) if cursor else 0
+    end = len(positions) if limit is None else min(len(positions), offset + limit)
+    columns = [frame.columns.get_loc(f) for f in fields]
+    df = frame.iloc[positions[offset:end], columns]
+    next_cursor = encode_cursor(version, end) if end < len(positions) else None
+    return df, next_cursor
+
+
+def parse_date(value, name):
+    """'YYYY-MM-DD' (or None) -> numpy datetime64; ValueError if unparseable."""
+    if value is None:
+        return None
+    try:
+        return pd.Timestamp(value).to_datetime64()
+    except ValueError:
+        raise ValueError(f"Invalid {name} date {value!r}; expected YYYY-MM-DD")
+
+
+def resample(df, period):
+    """
+    Downsample a date-ordered series to `period` (see RESAMPLE_PERIODS):
+    numeric fields are averaged, others keep the period's last value, and
+    date becomes the period's first day.
+    """
+    if period not in RESAMPLE_PERIODS:
+        raise ValueError(f"Invalid resample {period!r}; expected one of {list(RESAMPLE_PERIODS)}")
+    if df.empty:
+        return df
+    periods = pd.to_datetime(df["date"]).dt.to_period(RESAMPLE_PERIODS[period])
+    values = df.drop(columns=["date"])
+    numeric = [c for c in values.columns if pd.api.types.is_numeric_dtype(values[c])]
+    grouped = values.groupby(periods.to_numpy(), sort=True)
+
+    out = grouped[numeric].mean() if numeric else pd.DataFrame(index=grouped.size().index)
+    for col in values.columns:
+        if col not in numeric:
+            out[col] = grouped[col].last()
+    out.insert(0, "date", out.index.start_time.strftime("%Y-%m-%d"))
+    return out[["date"] + list(values.columns)].reset_index(drop=True)
@@ -1,47 +1,219 @@
-from fastapi import APIRouter
-import pandas as pd
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from backend.api import query
+from backend.api.cache import cached_response
+from backend.api.encoding import Shape, frame_response
+from backend.data_access.snapshot import snapshot_service
+from backend.data_access.spatial import parse_bbox
+from ml.rollups import LOD_ZOOMS
 
 router = APIRouter()
 
-DATA = "data/processed/merged_aadhaar.csv"
+# Include all fields that might be needed by dashboard
+# Handle missing columns gracefully for backward compatibility
+BASE_FIELDS = [
+    "district", "state", "CIIM",
+    "biometric_intensity",
+    "child_bio_ratio",
+    "bio_growth"
+]
+
+OPTIONAL_FIELDS = [
+    "TTF", "policy_flag", "growth_direction",
+    "total_enrolled", "data_quality_flag",
+    "CIIM_ACCEL", "CIIM_trend_3mo", "lat", "lon"
+]
+
+# Extra aggregates carried by the district/state rollups
+ROLLUP_FIELDS = [
+    "pincodes", "CIIM_max", "citizens_at_risk",
+    "children_at_risk", "flagged_pincodes"
+]
+
+# Map level-of-detail payloads: grid cells, or raw points when zoomed in
+LOD_FIELDS = ["zoom", "lat", "lon", "count", "CIIM_mean", "CIIM_max", "citizens_at_risk"]
+POINT_FIELDS = ["state", "district", "pincode", "CIIM", "policy_flag", "lat", "lon"]
+
 
 @router.get("/risk/map")
-def risk_map(date: str):
-    df = pd.read_csv(DATA)
-    df = df[df["date"] == date]
-
-    # Include all fields that might be needed by dashboard
-    # Handle missing columns gracefully for backward compatibility
-    base_fields = [
-        "district", "state", "CIIM",
-        "biometric_intensity",
-        "child_bio_ratio",
-        "bio_growth"
-    ]
-    
-    optional_fields = [
-        "TTF", "policy_flag", "growth_direction",
-        "total_enrolled", "data_quality_flag",
-        "CIIM_ACCEL", "CIIM_trend_3mo"
-    ]
-    
-    available_fields = base_fields + [f for f in optional_fields if f in df.columns]
-    
-    return df[available_fields].to_dict(orient="records")
+async def risk_map(
+    request: Request,
+    date: str,
+    level: Literal["pincode", "district", "state"] = "pincode",
+    state: Optional[str] = None,
+    bbox: Optional[str] = None,
+    policy_flag: Optional[List[str]] = Query(default=None),
+    min_ciim: Optional[float] = None,
+    max_ciim: Optional[float] = None,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=query.MAX_LIMIT),
+    cursor: Optional[str] = None,
+    shape: Shape = "records",
+):
+    """
+    Risk rows for one date.
+
+    `bbox` is a "min_lon,min_lat,max_lon,max_lat" viewport, `fields` a
+    comma-separated projection, `sort` e.g. "CIIM desc", and `policy_flag`
+    may be repeated. With `limit`, the X-Next-Cursor response header
+    carries the cursor for the next page (absent on the last page);
+    X-Total-Count is the number of matching rows.
+    """
+    snapshot = await snapshot_service.aget()
+    if level not in snapshot.levels:
+        raise HTTPException(status_code=404, detail=f"No {level}-level rollup in the current dataset")
+
+    def build():
+        frame, _ = snapshot.levels[level]
+        available_fields = [
+            f for f in BASE_FIELDS + OPTIONAL_FIELDS + (ROLLUP_FIELDS if level != "pincode" else [])
+            if f in frame.columns
+        ]
+
+        try:
+            projection = query.parse_fields(fields, available_fields)
+            order = query.parse_sort(sort, available_fields)
+            positions = snapshot.positions(date, level, state)
+            if bbox is not None:
+                positions = snapshot.in_bbox(level, positions, parse_bbox(bbox))
+            positions = query.select(
+                frame, positions,
+                policy_flag=policy_flag, min_ciim=min_ciim, max_ciim=max_ciim, sort=order,
+            )
+            df, next_cursor = query.page(frame, positions, projection, snapshot.version, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        response = frame_response(df, request, shape)
+        response.headers["X-Total-Count"] = str(len(positions))
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+
+    return await cached_response(request, snapshot, build)
+
+
+@router.get("/risk/map/lod")
+async def risk_map_lod(
+    request: Request,
+    date: str,
+    zoom: int = Query(ge=0, le=22),
+    bbox: Optional[str] = None,
+    shape: Shape = "records",
+):
+    """
+    Map markers for a viewport: grid cells (count, mean/max CIIM) up to the
+    last precomputed zoom level, raw pincode points beyond it. The X-LOD
+    response header says which ("cells" or "points").
+    """
+    snapshot = await snapshot_service.aget()
+
+    def build():
+        try:
+            box = parse_bbox(bbox) if bbox is not None else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        cells = snapshot.lod_cells(date, zoom, box) if zoom <= max(LOD_ZOOMS) else None
+        if cells is not None:
+            response = frame_response(cells[LOD_FIELDS], request, shape)
+            response.headers["X-LOD"] = "cells"
+            return response
+
+        positions = snapshot.positions(date)
+        if box is not None:
+            positions = snapshot.in_bbox("pincode", positions, box)
+        fields = [f for f in POINT_FIELDS if f in snapshot.frame.columns]
+        response = frame_response(snapshot.frame.iloc[positions][fields], request, shape)
+        response.headers["X-LOD"] = "points"
+        return response
+
+    return await cached_response(request, snapshot, build)
 
 
 @router.get("/risk/district/{district}")
-def district_risk(district: str):
-    df = pd.read_csv(DATA)
+async def district_risk(request: Request, district: str, shape: Shape = "records"):
+    """All districts with this name, across states; prefer /risk/district/{state}/{district}."""
+    snapshot = await snapshot_service.aget()
+    # Rows come back from the district index already in date order
+    return await cached_response(
+        request, snapshot, lambda: frame_response(snapshot.for_district(district), request, shape)
+    )
+
+
+@router.get("/risk/district/{state}/{district}")
+async def state_district_risk(request: Request, state: str, district: str, shape: Shape = "records"):
+    snapshot = await snapshot_service.aget()
+    return await cached_response(
+        request, snapshot, lambda: frame_response(snapshot.for_district(district, state), request, shape)
+    )
+
+
+@router.get("/risk/district/{state}/{district}/history")
+async def district_history(
+    request: Request,
+    state: str,
+    district: str,
+    start: Optional[str] = Query(default=None, alias="from"),
+    end: Optional[str] = Query(default=None, alias="to"),
+    fields: Optional[str] = None,
+    resample: Optional[Literal["month", "quarter", "year"]] = None,
+    shape: Shape = "records",
+):
+    """
+    Date-ordered district-level series between `from` and `to` (inclusive,
+    YYYY-MM-DD). `fields` is a comma-separated projection (date is always
+    included); `resample` averages numeric fields per month, quarter or year.
+    """
+    snapshot = await snapshot_service.aget()
+    if snapshot.series is None:
+        raise HTTPException(status_code=404, detail="No district-level rollup in the current dataset")
+
+    def build():
+        frame = snapshot.series[0]
+        available_fields = [
+            f for f in BASE_FIELDS + OPTIONAL_FIELDS + ROLLUP_FIELDS
+            if f in frame.columns and f not in ("state", "district")
+        ]
+        try:
+            projection = query.parse_fields(fields, available_fields)
+            df = snapshot.history(
+                state, district, query.parse_date(start, "from"), query.parse_date(end, "to")
+            )[["date"] + projection]
+            if resample is not None:
+                df = query.resample(df, resample)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return frame_response(df, request, shape)
 
-    # normalize
-    df["district"] = df["district"].str.strip().str.lower()
-    district = district.strip().lower()
+    return await cached_response(request, snapshot, build)
 
-    d = df[df["district"] == district]
 
-    if len(d) == 0:
-        return []
+@router.get("/districts/search")
+async def search_districts(
+    q: str,
+    state: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """
+    Autocomplete: the district `q` names (any spelling or alias), then
+    districts whose name (or a word in it) starts with `q`, then close matches.
+    """
+    snapshot = await snapshot_service.aget()
+    return snapshot.names.search(q, state=state, limit=limit)
 
-    return d.sort_values("date").to_dict(orient="records")
 
+@router.get("/districts/nearest")
+async def nearest_districts(
+    request: Request,
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    n: int = Query(default=5, ge=1, le=100),
+    shape: Shape = "records",
+):
+    snapshot = await snapshot_service.aget()
+    return await cached_response(
+        request, snapshot, lambda: frame_response(snapshot.nearest_districts(lat, lon, n), request, shape)
+    )
@@ -0,0 +1,84 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from backend.api import query
+from backend.api.cache import cached_response
+from backend.api.encoding import Shape, frame_response
+from backend.data_access.snapshot import snapshot_service
+from ml.action_simulator import ACTIONS, scenario_name, simulate_batch
+from ml.ciim import CIIM_WEIGHTS
+
+router = APIRouter()
+
+
+# Columns that identify a simulated row at each level
+SIMULATE_KEYS = {"district": ["district", "state"], "pincode": ["district", "state", "pincode"]}
+
+
+@router.get("/risk/simulate")
+async def simulate_risk(
+    request: Request,
+    date: str,
+    level: Literal["district", "pincode"] = "district",
+    state: Optional[str] = None,
+    scenario: List[str] = Query(default=list(ACTIONS)),
+    shape: Shape = "records",
+):
+    """
+    What-if CIIM for every district (or pincode) on `date` under each scenario.
+
+    District rows simulate the district rollup's enrollment-weighted
+    indicators. Repeat `scenario` for several scenarios; combine actions
+    with "+", e.g. ?scenario=NONE&scenario=OTP&scenario=OTP+FACE.
+    """
+    try:
+        scenarios = [scenario_name(s) for s in scenario]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    snapshot = await snapshot_service.aget()
+    if level not in snapshot.levels:
+        raise HTTPException(status_code=404, detail=f"No {level}-level rollup in the current dataset")
+
+    def build():
+        df = snapshot.for_date(date, level=level, state=state)
+
+        out = df[SIMULATE_KEYS[level] + ["CIIM"]].reset_index(drop=True)
+        simulated = simulate_batch(df, scenarios)
+        for i, name in enumerate(scenarios):
+            out[name] = simulated[:, i]
+
+        return frame_response(out, request, shape)
+
+    return await cached_response(request, snapshot, build)
+
+
+@router.get("/risk/reweight")
+async def reweight_risk(
+    request: Request,
+    date: str,
+    level: Literal["pincode", "district"] = "pincode",
+    state: Optional[str] = None,
+    intensity: float = Query(default=CIIM_WEIGHTS["biometric_intensity"], ge=0),
+    growth: float = Query(default=CIIM_WEIGHTS["growth_penalty"], ge=0),
+    exclusion: float = Query(default=CIIM_WEIGHTS["exclusion_risk"], ge=0),
+    limit: Optional[int] = Query(default=None, ge=1, le=query.MAX_LIMIT),
+    shape: Shape = "records",
+):
+    """
+    CIIM for `date` re-scored with custom component weights.
+
+    Weights default to the build's; percentile and rank (1 = highest) are
+    over every row of the date nationwide, also when `state` is given. Rows
+    come in rank order; X-Total-Count is the number before `limit`.
+    """
+    snapshot = await snapshot_service.aget()
+
+    def build():
+        df = snapshot.reweight(date, [intensity, growth, exclusion], level=level, state=state)
+        response = frame_response(df.head(limit) if limit else df, request, shape)
+        response.headers["X-Total-Count"] = str(len(df))
+        return response
+
+    return await cached_response(request, snapshot, build)
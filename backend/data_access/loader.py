@@ -1,18 +1,141 @@
 import pandas as pd
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from pandas.api.types import union_categoricals
 
 BASE_PATH = "data/raw"
+DATE_FORMAT = "%d-%m-%Y"
+
+# -----------------------------------
+# RAW SCHEMAS
+# -----------------------------------
+KEY_DTYPES = {
+    "date": "string",
+    "state": "category",
+    "district": "category",
+    "pincode": "int32",
+}
+
+SCHEMAS = {
+    "api_data_aadhar_biometric": {"bio_age_5_17": "int32", "bio_age_17_": "int32"},
+    "api_data_aadhar_enrolment": {"age_0_5": "int32", "age_5_17": "int32", "age_18_greater": "int32"},
+    "api_data_aadhar_demographic": {"demo_age_5_17": "int32", "demo_age_17_": "int32"},
+}
+
+CATEGORY_COLUMNS = ["state", "district"]
+
+_SHARD_RANGE = re.compile(r"_(\d+)_(\d+)\.csv$")
+
+
+def _shard_sort_key(path):
+    match = _SHARD_RANGE.search(path)
+    return (int(match.group(1)), path) if match else (-1, path)
+
 
-def load_folder(folder_name):
+def list_shards(folder_name):
     folder_path = os.path.join(BASE_PATH, folder_name)
-    all_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith(".csv")]
+    files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith(".csv")]
+    return sorted(files, key=_shard_sort_key)
+
+
+def _parse_dates(raw):
+    dates = pd.to_datetime(raw, format=DATE_FORMAT, errors="coerce")
+    # Fall back to the lenient parser for the odd row in another layout
+    retry = dates.isna() & raw.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(raw[retry], dayfirst=True, errors="coerce")
+    return dates
+
+
+def read_shard(path, folder_name, chunksize=None):
+    """
+    Read one raw shard with the dataset's explicit schema.
+
+    Returns a DataFrame, or an iterator of DataFrames when `chunksize` is set.
+    """
+    dtypes = {**KEY_DTYPES, **SCHEMAS.get(folder_name, {})}
+    usecols = list(dtypes) if folder_name in SCHEMAS else None
+
+    def typed(df):
+        df["date"] = _parse_dates(df["date"])
+        return df
+
+    if chunksize:
+        reader = pd.read_csv(path, dtype=dtypes, usecols=usecols, chunksize=chunksize)
+        return (typed(chunk) for chunk in reader)
+    return typed(pd.read_csv(path, dtype=dtypes, usecols=usecols))
+
+
+def empty_feed(folder_name):
+    """Zero-row frame with a raw feed's typed columns."""
+    columns = {"date": "datetime64[ns]", "state": "category", "district": "category", "pincode": "int32"}
+    return pd.DataFrame({c: pd.Series(dtype=t) for c, t in {**columns, **SCHEMAS[folder_name]}.items()})
+
+
+def concat_frames(frames):
+    # Unify categories first so the concatenated columns stay categorical
+    for col in CATEGORY_COLUMNS:
+        if all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            categories = union_categoricals([f[col] for f in frames]).categories
+            for f in frames:
+                f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def shard_key(path, folder_name):
+    """Key of a shard in the build manifest's sources: "<folder>/<file>"."""
+    return f"{folder_name}/{os.path.basename(path)}"
+
+
+def date_range(df):
+    """First and last date of a typed frame as "YYYY-MM-DD" (None if it has no dated rows)."""
+    dates = df["date"].dropna()
+    if dates.empty:
+        return {"min_date": None, "max_date": None}
+    return {"min_date": dates.min().strftime("%Y-%m-%d"), "max_date": dates.max().strftime("%Y-%m-%d")}
+
+
+def load_folder(folder_name, workers=None, dates=None, shards=None, date_ranges=None):
+    """
+    Load every shard of a raw feed (or only `shards`) into one typed frame.
+
+    `dates` keeps only rows on those dates; the filter is applied per shard
+    so discarded rows are never concatenated. `date_ranges`, if given, is
+    filled with each shard's date range (before filtering), keyed by shard_key().
+    """
+    files = list_shards(folder_name) if shards is None else list(shards)
+
+    def read(file):
+        df = read_shard(file, folder_name)
+        if date_ranges is not None:
+            date_ranges[shard_key(file, folder_name)] = date_range(df)
+        if dates is not None:
+            df = df[df["date"].isin(dates)]
+        return df
+
+    # Shards are independent, so parse them concurrently (the C parser releases the GIL)
+    with ThreadPoolExecutor(max_workers=workers or min(8, len(files) or 1)) as pool:
+        df_list = list(pool.map(read, files))
+
+    if not df_list:
+        return empty_feed(folder_name)
+    return concat_frames(df_list)
+
+
+def iter_folder(folder_name, chunksize=None, shards=None):
+    """
+    Yield typed frames shard by shard (or chunk by chunk) without concatenating.
 
-    df_list = []
-    for file in all_files:
-        df = pd.read_csv(file)
-        df_list.append(df)
+    `shards` restricts the walk to the given shard paths.
+    """
+    for file in shards if shards is not None else list_shards(folder_name):
+        if chunksize:
+            yield from read_shard(file, folder_name, chunksize=chunksize)
+        else:
+            yield read_shard(file, folder_name)
 
-    return pd.concat(df_list, ignore_index=True)
 
 def load_biometric():
     return load_folder("api_data_aadhar_biometric")
@@ -0,0 +1,265 @@
+"""
+State/district name normalization, aliases and search.
+
+The raw feeds spell the same place many ways ("West  Bengal", "WESTBENGAL",
+"Orissa"; "Gurgaon", "Karim Nagar", "Bagalkot *"). Lookups go through a
+key that is case-, punctuation- and space-insensitive and resolves known
+renames and misspellings, so every spelling reaches the same rows.
+Rollups group on that key and show the state's official name.
+"""
+import bisect
+import difflib
+import re
+
+import numpy as np
+
+# Alias -> canonical, in readable form (keys are compacted at import)
+STATE_ALIASES = {
+    "orissa": "odisha",
+    "pondicherry": "puducherry",
+    "uttaranchal": "uttarakhand",
+    "west bangal": "west bengal",
+    "dadra and nagar haveli": "dadra and nagar haveli and daman and diu",
+    "daman and diu": "dadra and nagar haveli and daman and diu",
+}
+
+DISTRICT_ALIASES = {
+    "gurgaon": "gurugram",
+    "allahabad": "prayagraj",
+    "faizabad": "ayodhya",
+    "bangalore": "bengaluru urban",
+    "bengaluru": "bengaluru urban",
+    "bangalore rural": "bengaluru rural",
+    "mysore": "mysuru",
+    "shimoga": "shivamogga",
+    "belgaum": "belagavi",
+    "bellary": "ballari",
+    "gulbarga": "kalaburagi",
+    "chikmagalur": "chikkamagaluru",
+    "chickmagalur": "chikkamagaluru",
+    "chamrajnagar": "chamarajanagar",
+    "chamrajanagar": "chamarajanagar",
+    "hasan": "hassan",
+    "ahmadnagar": "ahilyanagar",
+    "ahmed nagar": "ahilyanagar",
+    "chatrapati sambhaji nagar": "chhatrapati sambhajinagar",
+    "aurangabad(bh)": "aurangabad",
+    "raigarh(mh)": "raigarh",
+    "gondia": "gondiya",
+    "buldana": "buldhana",
+    "hardwar": "haridwar",
+    "hawrah": "howrah",
+    "haora": "howrah",
+    "hugli": "hooghly",
+    "hooghiy": "hooghly",
+    "darjiling": "darjeeling",
+    "koch bihar": "cooch behar",
+    "puruliya": "purulia",
+    "north twenty four parganas": "north 24 parganas",
+    "24 paraganas north": "north 24 parganas",
+    "south twenty four parganas": "south 24 parganas",
+    "24 paraganas south": "south 24 parganas",
+    "east midnapore": "purba medinipur",
+    "barddhaman": "bardhaman",
+    "cuddapah": "ysr kadapa",
+    "ananthapur": "anantapur",
+    "ananthapuramu": "anantapur",
+    "nellore": "sri potti sriramulu nellore",
+    "mahabub nagar": "mahbubnagar",
+    "rangareddi": "rangareddy",
+    "k v rangareddy": "rangareddy",
+    "firozpur": "ferozepur",
+    "muktsar": "sri muktsar sahib",
+    "sas nagar mohali": "s a s nagar mohali",
+    "nawanshahr": "shaheed bhagat singh nagar",
+    "baramula": "baramulla",
+    "badgam": "budgam",
+    "punch": "poonch",
+    "shupiyan": "shopian",
+    "bulandshahar": "bulandshahr",
+    "mahrajganj": "maharajganj",
+    "shrawasti": "shravasti",
+    "sant ravidas nagar": "bhadohi",
+    "sant ravidas nagar bhadohi": "bhadohi",
+    "jyotiba phule nagar": "amroha",
+    "kabeerdham": "kabirdham",
+    "kawardha": "kabirdham",
+    "palamau": "palamu",
+    "kodarma": "koderma",
+    "hazaribag": "hazaribagh",
+    "pakaur": "pakur",
+    "sahibganj": "sahebganj",
+    "purbi singhbhum": "east singhbhum",
+    "pashchimi singhbhum": "west singhbhum",
+    "monghyr": "munger",
+    "purnea": "purnia",
+    "samstipur": "samastipur",
+    "sheikpura": "sheikhpura",
+    "bhabua": "kaimur",
+    "purba champaran": "east champaran",
+    "baleswar": "balasore",
+    "baudh": "boudh",
+    "debagarh": "deogarh",
+    "khorda": "khordha",
+    "sundergarh": "sundargarh",
+    "nabarangapur": "nabarangpur",
+    "dhaulpur": "dholpur",
+    "jalor": "jalore",
+    "jhunjhunun": "jhunjhunu",
+    "chittaurgarh": "chittorgarh",
+    "narsimhapur": "narsinghpur",
+    "kasargod": "kasaragod",
+    "kancheepuram": "kanchipuram",
+    "sibsagar": "sivasagar",
+    "the dangs": "dang",
+    "panchmahals": "panchmahal",
+    "mewat": "nuh",
+}
+
+# Official state and union territory names; rollups display a state under
+# the name its key resolves to
+STATE_NAMES = [
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh", "Goa", "Gujarat",
+    "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", "Kerala", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh",
+    "Uttarakhand", "West Bengal", "Andaman and Nicobar Islands", "Chandigarh",
+    "Dadra and Nagar Haveli and Daman and Diu", "Delhi", "Jammu and Kashmir", "Ladakh",
+    "Lakshadweep", "Puducherry",
+]
+
+NAME_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name):
+    """Lowercase, '&' -> 'and', punctuation and repeated spaces collapsed."""
+    name = str(name).lower().replace("&", " and ")
+    return " ".join(NAME_RE.sub(" ", name).split())
+
+
+def _compact(name):
+    return normalize_name(name).replace(" ", "")
+
+
+_STATE_KEYS = {_compact(alias): _compact(canonical) for alias, canonical in STATE_ALIASES.items()}
+_DISTRICT_KEYS = {_compact(alias): _compact(canonical) for alias, canonical in DISTRICT_ALIASES.items()}
+
+
+def state_key(name):
+    key = _compact(name)
+    return _STATE_KEYS.get(key, key)
+
+
+def district_key(name):
+    key = _compact(name)
+    return _DISTRICT_KEYS.get(key, key)
+
+
+def map_names(names, fn):
+    """fn() of every value of a name column, computed once per distinct value (missing -> None)."""
+    cat = names.astype("category")
+    mapped = np.append(np.asarray(cat.cat.categories.map(fn), dtype=object), None)
+    return mapped[cat.cat.codes.to_numpy()]
+
+
+_STATE_NAMES = {state_key(name): name for name in STATE_NAMES}
+
+
+def canonical_state(name):
+    """Display name of a state spelling: the official name of its key, else the spelling tidied."""
+    return _STATE_NAMES.get(state_key(name)) or normalize_name(name).title()
+
+
+class NameIndex:
+    """
+    Distinct (state, district) pairs with prefix and fuzzy search.
+
+    A pair is listed once per (state key, district key), under the first
+    spelling seen, but every spelling of it in the data and every alias of
+    its district is searchable. Prefix search bisects a sorted list of
+    (token, entry) pairs, where the tokens of a name are its compact key and
+    every suffix of its normalized form that starts at a word, so "parg",
+    "24 parg" and "north24" all find "North 24 Parganas". A query whose
+    district key matches an entry exactly ranks that entry first, so
+    "ahmadnagar" finds Ahilyanagar however the data spells it. Queries with
+    too few hits are topped up with difflib close matches on the compact
+    names.
+    """
+
+    def __init__(self, pairs):
+        names = {}
+        for state, district in pairs:
+            key = (state_key(state), district_key(district))
+            if key not in names:
+                names[key] = (str(state), str(district), set())
+            names[key][2].add(str(district))
+
+        aliases = {}
+        for alias, canonical in DISTRICT_ALIASES.items():
+            aliases.setdefault(_compact(canonical), {canonical}).add(alias)
+
+        self.entries = sorted(
+            ((state, district) + key for key, (state, district, _) in names.items()),
+            key=lambda e: (e[3], e[2]),
+        )
+        tokens = set()
+        self.spellings = []
+        for i, (_, _, s_key, d_key) in enumerate(self.entries):
+            spellings = names[(s_key, d_key)][2] | aliases.get(d_key, set())
+            self.spellings.append({_compact(name) for name in spellings} | {d_key})
+            for name in spellings:
+                words = normalize_name(name).split()
+                for w in range(len(words)):
+                    tokens.add((" ".join(words[w:]), i))
+            tokens.update((key, i) for key in self.spellings[i])
+        self.tokens = sorted(tokens)
+        self.token_keys = [t for t, _ in self.tokens]
+
+        self._by_district = {}
+        self._by_key = {}
+        for i, entry in enumerate(self.entries):
+            self._by_district.setdefault(entry[3], []).append(i)
+            for key in self.spellings[i]:
+                self._by_key.setdefault(key, []).append(i)
+        self._keys = list(self._by_key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix(self, prefix):
+        start = bisect.bisect_left(self.token_keys, prefix)
+        end = bisect.bisect_left(self.token_keys, prefix + "\uffff")
+        return {i for _, i in self.tokens[start:end]}
+
+    def search(self, query, state=None, limit=10):
+        """[{"state", "district", "match"}] for an autocomplete query."""
+        wanted_state = state_key(state) if state else None
+
+        def allowed(i):
+            return wanted_state is None or self.entries[i][2] == wanted_state
+
+        normalized, compact = normalize_name(query), _compact(query)
+        if not normalized:
+            return []
+
+        # The query's own district first, then whole-name prefix matches,
+        # then word matches, each in name order
+        exact = [i for i in self._by_district.get(district_key(query), []) if allowed(i)]
+        taken = set(exact)
+        hits = [i for i in self._prefix(normalized) | self._prefix(compact) if allowed(i) and i not in taken]
+        hits.sort(key=lambda i: (not any(k.startswith(compact) for k in self.spellings[i]), i))
+        results = [(i, "exact") for i in exact] + [(i, "prefix") for i in hits]
+        results = results[:limit]
+
+        if len(results) < limit:
+            taken.update(hits)
+            for key in difflib.get_close_matches(compact, self._keys, n=limit * 2, cutoff=0.75):
+                for i in self._by_key[key]:
+                    if i not in taken and allowed(i) and len(results) < limit:
+                        taken.add(i)
+                        results.append((i, "fuzzy"))
+
+        return [
+            {"state": self.entries[i][0], "district": self.entries[i][1], "match": match}
+            for i, match in results
+        ]
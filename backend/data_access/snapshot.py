@@ -0,0 +1,392 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backend.data_access.names import NameIndex, canonical_state, district_key, map_names, state_key
+from backend.data_access.spatial import GridIndex
+from backend.data_access.store import MANIFEST_FILE, STORE_PATH, read_manifest, read_store
+from ml.ciim import CIIM_WEIGHTS
+from ml.rollups import LOD_TABLE, LOD_ZOOMS
+from ml.ts_kernels import segment_offsets
+
+# Granularity level -> store table
+LEVEL_TABLES = {"pincode": "risk", "district": "district", "state": "state"}
+
+
+def _by_date(df):
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def _group_index(*keys):
+    """
+    Row positions grouped by the given per-row key arrays (first is the
+    outermost), plus each group's (start, end) range in that order. Rows
+    keep their existing relative order within a group.
+    """
+    if len(keys[0]) == 0:
+        return np.array([], dtype=np.int64), {}
+    codes = [pd.factorize(k)[0] for k in keys]
+    order = np.lexsort(codes[::-1])
+
+    changed = np.zeros(len(order) - 1, dtype=bool)
+    for c in codes:
+        c = c[order]
+        changed |= c[1:] != c[:-1]
+    boundaries = np.flatnonzero(changed) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(order)]))
+    return order, {
+        tuple(k[order[s]] for k in keys): (int(s), int(e)) for s, e in zip(starts, ends)
+    }
+
+
+def _date_state_index(df):
+    """Rows grouped by (date, state key); within a group rows keep date-slice order."""
+    return _group_index(df["date"].to_numpy(), map_names(df["state"], state_key))
+
+
+def _locations(df):
+    """
+    Grid index over a frame's distinct (lat, lon) points, and each row's
+    point id (-1 where coordinates are missing).
+    """
+    grouped = df.groupby(["lat", "lon"], sort=True, dropna=True)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    points = grouped.size().index
+    return GridIndex(points.get_level_values(0), points.get_level_values(1)), codes
+
+
+def _ciim_components(df):
+    """CIIM inputs as one C-contiguous (component, row) float64 array, in CIIM_WEIGHTS order."""
+    columns = {
+        "biometric_intensity": df["biometric_intensity"],
+        "growth_penalty": df["bio_growth"].clip(lower=0),
+        "exclusion_risk": df["exclusion_risk"],
+    }
+    return np.ascontiguousarray(np.vstack([columns[name].to_numpy(np.float64) for name in CIIM_WEIGHTS]))
+
+
+def _percentile(values):
+    """Percentile rank (0-100, 1 decimal) as the build computes CIIM_percentile for a date."""
+    if len(values) < 2:
+        return np.full(len(values), 50.0)
+    return (pd.Series(values).rank(pct=True) * 100).round(1).fillna(50).to_numpy()
+
+
+def _range_index(keys):
+    """Map each distinct value of a sorted key array to its (start, end) row range."""
+    offsets = segment_offsets(keys)
+    return {keys[s]: (int(s), int(e)) for s, e in zip(offsets[:-1], offsets[1:])}
+
+
+class RiskSnapshot:
+    """
+    Immutable in-memory copy of the processed risk table.
+
+    Rows are kept sorted by date so a date lookup is a contiguous slice.
+    Further permutations group rows by district key and by (state key,
+    district key), date-ordered within each group, and by (date, state
+    key) for every level. Keys resolve spelling variants and aliases (see
+    backend/data_access/names.py). District/state rollups are held the
+    same way. When the build attached coordinates, every level also gets a
+    grid index over its distinct points for bbox queries, and districts
+    get one for nearest-neighbour lookups. Precomputed map LOD cells are
+    indexed by (date, zoom).
+    """
+
+    def __init__(self, df, version, load_seconds=0.0, rollups=None, modified=None, lod=None):
+        df = _by_date(df)
+
+        self.frame = df
+        self.version = version
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        # When this dataset version was first written (epoch seconds)
+        self.modified = modified if modified is not None else self.loaded_at
+        self._memory_bytes = None
+
+        self.date_index = _range_index(df["date"].to_numpy())
+
+        # Keys are computed once per distinct name instead of every row
+        states = map_names(df["state"], state_key)
+        districts = map_names(df["district"], district_key)
+        self.district_order, district_index = _group_index(districts)
+        self.district_index = {key: bounds for (key,), bounds in district_index.items()}
+        self.pair_order, self.pair_index = _group_index(states, districts)
+        self.names = NameIndex(df[["state", "district"]].drop_duplicates().itertuples(index=False))
+
+        # Re-weighting works on date column-slices of these arrays; districts
+        # are grouped on (canonical state, district) like the rollups
+        self.components = _ciim_components(df)
+        self.enrolled = df["total_enrolled"].to_numpy(np.float64)
+        self.rollup_codes, pairs = pd.MultiIndex.from_arrays(
+            [map_names(df["state"], canonical_state), df["district"]]
+        ).factorize()
+        self.rollup_pairs = pairs.to_frame(index=False, name=["state", "district"])
+
+        self.levels = {"pincode": (self.frame, self.date_index)}
+        for level, rollup in (rollups or {}).items():
+            rollup = _by_date(rollup)
+            self.levels[level] = (rollup, _range_index(rollup["date"].to_numpy()))
+
+        self.state_indexes = {level: _date_state_index(frame) for level, (frame, _) in self.levels.items()}
+
+        self.spatial = {
+            level: _locations(frame)
+            for level, (frame, _) in self.levels.items()
+            if {"lat", "lon"} <= set(frame.columns)
+        }
+        if lod is not None:
+            lod = _by_date(lod)
+            self.lod = (lod, *_group_index(lod["date"].to_numpy(), lod["zoom"].to_numpy()))
+        else:
+            self.lod = None
+
+        # Per-district history: the district rollup re-ordered so each
+        # district's rows are one contiguous, date-sorted run
+        if "district" in self.levels:
+            rollup = self.levels["district"][0]
+            order, index = _group_index(
+                map_names(rollup["state"], state_key), map_names(rollup["district"], district_key)
+            )
+            series = rollup.take(order).reset_index(drop=True)
+            self.series = (series, pd.to_datetime(series["date"]).to_numpy(), index)
+        else:
+            self.series = None
+
+        source = self.levels.get("district", self.levels["pincode"])[0]
+        if {"lat", "lon"} <= set(source.columns):
+            points = source[["state", "district", "lat", "lon"]].dropna(subset=["lat", "lon"])
+            self.district_points = points.drop_duplicates(["state", "district"]).reset_index(drop=True)
+            self.district_grid = GridIndex(self.district_points["lat"], self.district_points["lon"])
+        else:
+            self.district_points, self.district_grid = None, None
+
+    @property
+    def dates(self):
+        return list(self.date_index)
+
+    def memory_bytes(self):
+        """Approximate resident size of the frames and index arrays (computed once)."""
+        if self._memory_bytes is None:
+            frames = [frame for frame, _ in self.levels.values()]
+            if self.lod is not None:
+                frames.append(self.lod[0])
+            arrays = [self.district_order, self.pair_order, self.components, self.enrolled, self.rollup_codes]
+            if self.series is not None:
+                frames.append(self.series[0])
+                arrays.append(self.series[1])
+            arrays += [order for order, _ in self.state_indexes.values()]
+            self._memory_bytes = int(
+                sum(f.memory_usage(index=True, deep=True).sum() for f in frames)
+                + sum(a.nbytes for a in arrays)
+            )
+        return self._memory_bytes
+
+    def positions(self, date, level="pincode", state=None):
+        """Row positions in the level's frame for a date, optionally one state."""
+        if state is None:
+            start, end = self.levels[level][1].get(date, (0, 0))
+            return np.arange(start, end)
+        order, index = self.state_indexes[level]
+        start, end = index.get((date, state_key(state)), (0, 0))
+        return order[start:end]
+
+    def in_bbox(self, level, positions, bbox):
+        """The subset of `positions` whose coordinates fall inside `bbox` (min_lon, min_lat, max_lon, max_lat)."""
+        if level not in self.spatial:
+            return positions[:0]
+        grid, codes = self.spatial[level]
+        inside = np.zeros(len(grid) + 1, dtype=bool)  # last slot: rows without coordinates
+        inside[grid.within(*bbox)] = True
+        return positions[inside[codes[positions]]]
+
+    def nearest_districts(self, lat, lon, n=5):
+        """The `n` districts closest to (lat, lon), with distance_km, nearest first."""
+        if self.district_grid is None:
+            return pd.DataFrame(columns=["state", "district", "lat", "lon", "distance_km"])
+        ids, dists = self.district_grid.nearest(lat, lon, n)
+        return self.district_points.iloc[ids].assign(distance_km=dists)
+
+    def lod_cells(self, date, zoom, bbox=None):
+        """
+        Map cells for a date at the finest precomputed LOD zoom not above
+        `zoom` (the coarsest one for lower zooms); None without LOD data.
+        Cells are kept when their centroid falls inside `bbox`.
+        """
+        if self.lod is None:
+            return None
+        frame, order, index = self.lod
+        lod_zoom = max((z for z in LOD_ZOOMS if z <= zoom), default=min(LOD_ZOOMS))
+        start, end = index.get((date, lod_zoom), (0, 0))
+        cells = frame.take(order[start:end])
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            cells = cells[cells["lat"].between(min_lat, max_lat) & cells["lon"].between(min_lon, max_lon)]
+        return cells
+
+    def reweight(self, date, weights, level="pincode", state=None):
+        """
+        CIIM for a date recomputed with `weights` (one per CIIM_WEIGHTS
+        component), with its nationwide percentile and rank (1 = highest).
+        District rows are enrollment-weighted means of their pincodes, as in
+        the rollups. Rows come back in rank order, then filtered to `state`.
+        """
+        start, end = self.date_index.get(date, (0, 0))
+        weights = np.asarray(weights, dtype=np.float64)
+        ciim = np.clip(weights @ self.components[:, start:end], 0, 1)
+        stored = self.frame["CIIM"].to_numpy(np.float64)[start:end]
+
+        if level == "pincode":
+            rows = self.frame.iloc[start:end][["state", "district", "pincode"]].reset_index(drop=True)
+        else:
+            pairs, codes = np.unique(self.rollup_codes[start:end], return_inverse=True)
+            enrolled = self.enrolled[start:end]
+            total = np.bincount(codes, enrolled)
+            ciim = np.bincount(codes, enrolled * ciim) / total
+            stored = np.bincount(codes, enrolled * stored) / total
+            rows = self.rollup_pairs.iloc[pairs].reset_index(drop=True)
+
+        rows["CIIM"] = stored.round(4)
+        rows["CIIM_reweighted"] = ciim.round(4)
+        rows["CIIM_percentile"] = _percentile(ciim)
+        rows["rank"] = pd.Series(-ciim).rank(method="min").to_numpy(np.int64)
+        rows = rows.take(np.argsort(rows["rank"].to_numpy(), kind="stable"))
+        if state is not None:
+            rows = rows[map_names(rows["state"], state_key) == state_key(state)]
+        return rows.reset_index(drop=True)
+
+    def history(self, state, district, start=None, end=None):
+        """
+        District-rollup rows of one district with start <= date <= end
+        (datetime64 bounds, None = open), found by binary search in its
+        contiguous series. None without a district rollup.
+        """
+        if self.series is None:
+            return None
+        frame, dates, index = self.series
+        lo, hi = index.get((state_key(state), district_key(district)), (0, 0))
+        run = dates[lo:hi]
+        first = lo + (np.searchsorted(run, start, side="left") if start is not None else 0)
+        last = lo + (np.searchsorted(run, end, side="right") if end is not None else len(run))
+        return frame.iloc[first:last]
+
+    def for_date(self, date, level="pincode", state=None):
+        frame, index = self.levels[level]
+        if state is not None:
+            return frame.take(self.positions(date, level, state))
+        start, end = index.get(date, (0, 0))
+        return frame.iloc[start:end]
+
+    def for_district(self, district, state=None):
+        """Date-ordered rows of a district; without `state`, same-named districts are merged."""
+        if state is None:
+            start, end = self.district_index.get(district_key(district), (0, 0))
+            return self.frame.take(self.district_order[start:end])
+        start, end = self.pair_index.get((state_key(state), district_key(district)), (0, 0))
+        return self.frame.take(self.pair_order[start:end])
+
+
+class SnapshotService:
+    """
+    Process-wide holder of the current RiskSnapshot.
+
+    get() is cheap on the hot path: it stats the store manifest and only
+    re-reads the store when the dataset version stamped in it has changed.
+    aget() is the event-loop variant: the reload runs in a worker thread and
+    concurrent callers await one shared in-flight load (single-flight), so
+    a burst of requests after a deploy or refresh loads the store once.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._snapshot = None
+        self._stat = None
+        self._lock = threading.Lock()
+        self._inflight = None
+        # Load statistics, exported by /metrics
+        self.loads = 0
+        self.load_seconds_total = 0.0
+
+    @property
+    def current(self):
+        """The loaded snapshot, or None; never triggers a load."""
+        return self._snapshot
+
+    def _manifest_stat(self):
+        st = os.stat(os.path.join(self.path, MANIFEST_FILE))
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _manifest_version(manifest):
+        # Stores written before versions were stamped fall back to a manifest hash
+        version = manifest.get("version") or hashlib.sha1(
+            json.dumps(manifest, sort_keys=True).encode()
+        ).hexdigest()
+        stamped = manifest.get("version_at") or manifest.get("updated_at")
+        modified = datetime.fromisoformat(stamped).timestamp() if stamped else None
+        return version, modified
+
+    def get(self):
+        stat = self._manifest_stat()
+        if self._snapshot is not None and stat == self._stat:
+            return self._snapshot
+
+        with self._lock:
+            stat = self._manifest_stat()
+            if self._snapshot is None or stat != self._stat:
+                manifest = read_manifest(self.path)
+                version, modified = self._manifest_version(manifest)
+                if self._snapshot is None or version != self._snapshot.version:
+                    self._snapshot = self.load(version, modified, manifest)
+                    self.loads += 1
+                    self.load_seconds_total += self._snapshot.load_seconds
+                self._stat = stat
+            return self._snapshot
+
+    async def aget(self):
+        stat = self._manifest_stat()
+        if self._snapshot is not None and stat == self._stat:
+            return self._snapshot
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._reload())
+        # shield: a cancelled request must not cancel the load others wait on
+        return await asyncio.shield(self._inflight)
+
+    async def _reload(self):
+        try:
+            return await asyncio.to_thread(self.get)
+        finally:
+            self._inflight = None
+
+    def load(self, version, modified=None, manifest=None):
+        started = time.perf_counter()
+        # Every table comes from the same published manifest
+        manifest = manifest or read_manifest(self.path)
+        tables = manifest["tables"]
+        df = read_store(self.path, manifest=manifest)
+        rollups = {
+            level: read_store(self.path, table=table, manifest=manifest)
+            for level, table in LEVEL_TABLES.items()
+            if level != "pincode" and table in tables
+        }
+        lod = read_store(self.path, table=LOD_TABLE, manifest=manifest) if LOD_TABLE in tables else None
+        snapshot = RiskSnapshot(
+            df, version, load_seconds=time.perf_counter() - started,
+            rollups=rollups, modified=modified, lod=lod
+        )
+        snapshot.memory_bytes()  # measured here, off the request path
+        return snapshot
+
+
+snapshot_service = SnapshotService()
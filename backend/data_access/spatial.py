@@ -0,0 +1,119 @@
+"""
+Uniform lat/lon grid index for viewport (bbox) and nearest-point queries.
+
+Points are bucketed into CELL_DEGREES x CELL_DEGREES cells. A bbox query
+only tests points in the cells it overlaps; a nearest query searches rings
+of cells outward from the query point and stops once no unvisited cell can
+hold a closer point.
+"""
+import math
+
+import numpy as np
+
+CELL_DEGREES = 1.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance from (lat, lon) to each of (lats, lons)."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def parse_bbox(bbox):
+    """'min_lon,min_lat,max_lon,max_lat' (GeoJSON order) -> tuple of floats."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid bbox {bbox!r}; expected 'min_lon,min_lat,max_lon,max_lat'")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError(f"Invalid bbox {bbox!r}; min must not exceed max")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+class GridIndex:
+    """Grid over a fixed set of points; ids are positions in `lat`/`lon`."""
+
+    def __init__(self, lat, lon, cell=CELL_DEGREES):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell = cell
+
+        valid = np.flatnonzero(np.isfinite(self.lat) & np.isfinite(self.lon))
+        rows = np.floor(self.lat[valid] / cell).astype(np.int64)
+        cols = np.floor(self.lon[valid] / cell).astype(np.int64)
+
+        self.cells = {}
+        order = np.lexsort((cols, rows))
+        for r, c, i in zip(rows[order], cols[order], valid[order]):
+            self.cells.setdefault((int(r), int(c)), []).append(i)
+        self.cells = {key: np.asarray(ids) for key, ids in self.cells.items()}
+
+        if len(valid):
+            self.row_range = (int(rows.min()), int(rows.max()))
+            self.col_range = (int(cols.min()), int(cols.max()))
+            self.max_abs_lat = float(np.abs(self.lat[valid]).max())
+        else:
+            self.row_range = self.col_range = (0, -1)
+            self.max_abs_lat = 0.0
+
+    def __len__(self):
+        return len(self.lat)
+
+    def within(self, min_lon, min_lat, max_lon, max_lat):
+        """Ids of points inside the (inclusive) bbox."""
+        r0 = max(math.floor(min_lat / self.cell), self.row_range[0])
+        r1 = min(math.floor(max_lat / self.cell), self.row_range[1])
+        c0 = max(math.floor(min_lon / self.cell), self.col_range[0])
+        c1 = min(math.floor(max_lon / self.cell), self.col_range[1])
+
+        candidates = [
+            self.cells[(r, c)]
+            for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)
+            if (r, c) in self.cells
+        ]
+        if not candidates:
+            return np.array([], dtype=np.int64)
+        ids = np.concatenate(candidates)
+        lat, lon = self.lat[ids], self.lon[ids]
+        return np.sort(ids[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)])
+
+    def _ring(self, r0, c0, radius):
+        if radius == 0:
+            return [(r0, c0)]
+        ring = [(r0 + dr, c0 + dc) for dr in (-radius, radius) for dc in range(-radius, radius + 1)]
+        ring += [(r0 + dr, c0 + dc) for dc in (-radius, radius) for dr in range(-radius + 1, radius)]
+        return ring
+
+    def nearest(self, lat, lon, n=5):
+        """(ids, distances in km) of the `n` points closest to (lat, lon), nearest first."""
+        if not self.cells:
+            return np.array([], dtype=np.int64), np.array([])
+        r0, c0 = math.floor(lat / self.cell), math.floor(lon / self.cell)
+        max_radius = max(
+            abs(r0 - self.row_range[0]), abs(r0 - self.row_range[1]),
+            abs(c0 - self.col_range[0]), abs(c0 - self.col_range[1]),
+        )
+        # Points outside ring `radius` are more than radius cells away in latitude
+        # or longitude; a longitude gap is shortest at the highest latitude involved
+        cos_lat = math.cos(math.radians(min(89.0, max(abs(lat), self.max_abs_lat))))
+
+        def bound_km(radius):
+            gap = math.radians(radius * self.cell)
+            along_lon = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, cos_lat * math.sin(gap / 2)))
+            return min(EARTH_RADIUS_KM * gap, along_lon)
+
+        ids, dists = np.array([], dtype=np.int64), np.array([])
+        for radius in range(max_radius + 1):
+            found = [self.cells[key] for key in self._ring(r0, c0, radius) if key in self.cells]
+            if found:
+                new = np.concatenate(found)
+                ids = np.concatenate((ids, new))
+                dists = np.concatenate((dists, haversine_km(lat, lon, self.lat[new], self.lon[new])))
+            if len(ids) >= n and np.partition(dists, n - 1)[n - 1] <= bound_km(radius):
+                break
+
+        order = np.lexsort((ids, dists))[:n]
+        return ids[order], dists[order]
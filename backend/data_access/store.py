@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+STORE_PATH = "data/processed/risk_store"
+MANIFEST_FILE = "manifest.json"
+DEFAULT_TABLE = "risk"
+
+# Low-cardinality string columns are stored as dictionary-encoded categoricals
+CATEGORY_COLUMNS = [
+    "state", "district",
+    "data_quality_flag", "growth_reliability",
+    "growth_direction", "policy_flag",
+]
+
+
+def _partition_file(date_key, content_hash):
+    # Named by content, so a rebuild never overwrites a file the published
+    # manifest still points at
+    return f"date={date_key}-{content_hash[:12]}.parquet"
+
+
+def _atomic_write_json(obj, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _content_hash(df):
+    """Order-sensitive hash of a frame's values."""
+    values = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+def _stamp_version(manifest, previous_version=None):
+    """
+    Set the dataset version: a hash of every table's schema and partition
+    contents. It only changes when the data does, so rebuilding identical
+    inputs keeps the version (and any HTTP caches keyed on it) valid.
+    `version_at` records when the current version first appeared.
+    """
+    digest = hashlib.sha1()
+    for table, meta in sorted(manifest["tables"].items()):
+        digest.update(json.dumps([table, meta["columns"]], sort_keys=True).encode())
+        for date_key, part in meta["partitions"].items():
+            digest.update(f"{date_key}:{part.get('hash', part['file'])}".encode())
+    version = digest.hexdigest()
+
+    if version != previous_version or "version_at" not in manifest:
+        manifest["version_at"] = manifest["updated_at"]
+    manifest["version"] = version
+    return manifest
+
+
+def _typed(df):
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def read_manifest(path=STORE_PATH):
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def update_manifest(path=STORE_PATH, metadata=None):
+    manifest = read_manifest(path)
+    manifest.update(metadata or {})
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    _atomic_write_json(manifest, os.path.join(path, MANIFEST_FILE))
+    return manifest
+
+
+def open_manifest(path=STORE_PATH, keep_tables=True):
+    """
+    Start a store write: a copy of the published manifest to stage tables
+    into (an empty one for a new store). A full rebuild passes
+    keep_tables=False so tables it does not write again are dropped.
+    Nothing is visible to readers until publish_manifest().
+    """
+    try:
+        manifest = read_manifest(path)
+    except FileNotFoundError:
+        manifest = {"format": "parquet", "tables": {}}
+    if not keep_tables:
+        manifest["tables"] = {}
+    return manifest
+
+
+def write_partitions(df, manifest, path=STORE_PATH, table=DEFAULT_TABLE, mode="overwrite", dates=None):
+    """
+    Write a table as one Parquet file per date and record it in `manifest`.
+
+    mode="overwrite" replaces every partition of the table,
+    mode="upsert" only replaces the dates present in `df`; `dates` lists
+    the "YYYY-MM-DD" keys the upsert covers, and those without rows in `df`
+    are dropped.
+    """
+    table_dir = os.path.join(path, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    df = _typed(df)
+    date_keys = df["date"].dt.strftime("%Y-%m-%d")
+
+    previous = manifest["tables"].get(table, {}).get("partitions", {})
+    partitions = dict(previous) if mode == "upsert" else {}
+    for date_key in dates or []:
+        partitions.pop(date_key, None)
+
+    for date_key, part in df.groupby(date_keys, sort=True, observed=True):
+        content_hash = _content_hash(part)
+        file_name = _partition_file(date_key, content_hash)
+        tmp_path = os.path.join(table_dir, file_name + ".tmp")
+        part.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, os.path.join(table_dir, file_name))
+        partitions[date_key] = {"file": file_name, "rows": int(len(part)), "hash": content_hash}
+
+    manifest["tables"][table] = {
+        "columns": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "partitions": dict(sorted(partitions.items())),
+        "rows": int(sum(p["rows"] for p in partitions.values())),
+    }
+    return manifest
+
+
+def publish_manifest(manifest, path=STORE_PATH, metadata=None):
+    """
+    Stamp the version and switch readers to `manifest` in one atomic write,
+    then delete partition files that neither it nor the manifest it replaced
+    references.
+
+    Files of the replaced version stay until the next publish, so a reader
+    that has just read the old manifest can still open them. Only files
+    older than the replaced manifest are deleted; newer ones may belong to a
+    build that has not published yet. `metadata` is merged into the top
+    level of the manifest.
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    try:
+        published = read_manifest(path)
+        published_at = os.stat(manifest_path).st_mtime_ns
+    except FileNotFoundError:
+        published, published_at = {"tables": {}}, None
+
+    manifest.update(metadata or {})
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    _stamp_version(manifest, published.get("version"))
+    _atomic_write_json(manifest, manifest_path)
+
+    # Only after the manifest switched; this also sweeps files left behind by
+    # an interrupted build
+    if published_at is None:
+        return manifest
+    for table in set(published["tables"]) | set(manifest["tables"]):
+        table_dir = os.path.join(path, table)
+        if not os.path.isdir(table_dir):
+            continue
+        live = {
+            p["file"]
+            for m in (manifest, published)
+            for p in m["tables"].get(table, {}).get("partitions", {}).values()
+        }
+        for file_name in os.listdir(table_dir):
+            file_path = os.path.join(table_dir, file_name)
+            if (file_name.startswith("date=") and file_name not in live
+                    and os.stat(file_path).st_mtime_ns < published_at):
+                os.remove(file_path)
+    return manifest
+
+
+def write_store(df, path=STORE_PATH, table=DEFAULT_TABLE, mode="overwrite", metadata=None, dates=None):
+    """Write and publish a single table (see write_partitions for `mode` and `dates`)."""
+    manifest = write_partitions(df, open_manifest(path), path, table=table, mode=mode, dates=dates)
+    return publish_manifest(manifest, path, metadata)
+
+
+def list_dates(path=STORE_PATH, table=DEFAULT_TABLE):
+    return list(read_manifest(path)["tables"][table]["partitions"])
+
+
+def read_store(path=STORE_PATH, table=DEFAULT_TABLE, dates=None, start=None, end=None, columns=None,
+               manifest=None):
+    """
+    Load a table from the columnar store.
+
+    Only the partitions matching `dates` (exact "YYYY-MM-DD" keys or
+    "YYYY-MM" month prefixes) and/or the inclusive `start`/`end` range are
+    opened, and only `columns` are decoded. Pass `manifest` to read several
+    tables from the same published version.
+    """
+    manifest = manifest or read_manifest(path)
+    meta = manifest["tables"][table]
+    selected = list(meta["partitions"])
+
+    if dates is not None:
+        if isinstance(dates, str):
+            dates = [dates]
+        wanted = [str(d) for d in dates]
+        selected = [d for d in selected if d in wanted or d[:7] in wanted]
+    if start is not None:
+        selected = [d for d in selected if d >= str(start)]
+    if end is not None:
+        selected = [d for d in selected if d <= str(end)]
+
+    if columns is not None:
+        columns = [c for c in columns if c in meta["columns"]]
+
+    frames = [
+        pd.read_parquet(os.path.join(path, table, meta["partitions"][d]["file"]), columns=columns)
+        for d in selected
+    ]
+    if not frames:
+        return pd.DataFrame(columns=columns if columns is not None else list(meta["columns"]))
+
+    df = pd.concat(frames, ignore_index=True)
+    # concat of per-file categoricals with different categories degrades to object
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype != "category":
+            df[col] = df[col].astype("category")
+    return df
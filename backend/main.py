@@ -1,7 +1,42 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from backend.api import health, risk
+from fastapi.middleware.gzip import GZipMiddleware
+from backend.api import health, metrics, policy, risk, simulate
+from backend.api.cache import GZIP_LEVEL, GZIP_MIN_SIZE
+from backend.data_access.snapshot import snapshot_service
+
+
+async def _warm_snapshot():
+    try:
+        await snapshot_service.aget()
+    except FileNotFoundError:
+        print("⚠️  Risk store not found - run ml/feature_builder.py first")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm the risk snapshot at startup instead of on the first request. It
+    # loads in the background so liveness and readiness probes answer meanwhile.
+    warmup = asyncio.create_task(_warm_snapshot())
+    yield
+    warmup.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup
+
+
+app = FastAPI(title="Aadhaar CIIM Risk Engine", lifespan=lifespan)
 
-app = FastAPI(title="Aadhaar CIIM Risk Engine")
+# Month-wide map payloads are large and repetitive. Cached risk responses
+# arrive already compressed (backend/api/cache.py) and pass through; this
+# covers everything else with the same settings
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+# Added last so it wraps gzip and counts the bytes actually sent
+app.middleware("http")(metrics.track_requests)
 
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(risk.router, prefix="/api/v1")
+app.include_router(simulate.router, prefix="/api/v1")
+app.include_router(policy.router, prefix="/api/v1")
+app.include_router(metrics.router)
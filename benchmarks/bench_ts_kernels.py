@@ -0,0 +1,116 @@
+"""
+Equivalence check and benchmark for ml/ts_kernels.py.
+
+Runs the original per-group pandas implementations of the growth, CIIM
+acceleration and 3-month trend steps next to the segment kernels on a
+synthetic (district, date)-sorted table, asserts bit-for-bit identical
+output and reports timings.
+
+    python -m benchmarks.bench_ts_kernels --rows 200000 --districts 700
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ml.ts_kernels import grouped_diff, grouped_rolling_mean, grouped_trend, segment_offsets
+
+ROLLING_WINDOW = 3
+
+
+def calculate_trend(series):
+    if len(series) < 2:
+        return 0
+    first = series.iloc[0]
+    last = series.iloc[-1]
+    if last > first * 1.1:
+        return 1
+    elif last < first * 0.9:
+        return -1
+    else:
+        return 0
+
+
+def reference(df):
+    out = {}
+    out["bio_growth_raw"] = df.groupby("district")["biometric_intensity"].diff().fillna(0)
+    out["bio_growth"] = (
+        out["bio_growth_raw"].groupby(df["district"])
+        .transform(lambda x: x.rolling(window=ROLLING_WINDOW, min_periods=1).mean())
+    )
+    ciim_diff = df.groupby("district")["CIIM"].diff().fillna(0)
+    out["CIIM_ACCEL"] = (
+        ciim_diff.groupby(df["district"])
+        .transform(lambda x: x.rolling(window=ROLLING_WINDOW, min_periods=1).mean())
+    )
+    out["CIIM_trend_3mo"] = (
+        df.groupby("district")["CIIM"]
+        .transform(lambda x: x.rolling(window=3, min_periods=2).apply(calculate_trend, raw=False))
+    )
+    return {k: v.to_numpy() for k, v in out.items()}
+
+
+def kernels(df):
+    offsets = segment_offsets(df["district"].to_numpy())
+    out = {}
+    out["bio_growth_raw"] = np.nan_to_num(grouped_diff(df["biometric_intensity"], offsets))
+    out["bio_growth"] = grouped_rolling_mean(out["bio_growth_raw"], offsets, ROLLING_WINDOW)
+    ciim_diff = np.nan_to_num(grouped_diff(df["CIIM"], offsets))
+    out["CIIM_ACCEL"] = grouped_rolling_mean(ciim_diff, offsets, ROLLING_WINDOW)
+    out["CIIM_trend_3mo"] = grouped_trend(df["CIIM"], offsets, window=3, min_periods=2)
+    return out
+
+
+def synthetic_table(rows, districts, seed=0):
+    rng = np.random.default_rng(seed)
+    district = np.sort(rng.integers(0, districts, rows))
+    intensity = rng.uniform(0, 1, rows)
+    # Plenty of exact repeats and zeros, which exercise the kernel edge cases
+    intensity[rng.random(rows) < 0.1] = 1.0
+    ciim = np.round(rng.uniform(0, 1, rows), 4)
+    ciim[rng.random(rows) < 0.05] = 0.0
+    return pd.DataFrame({
+        "district": pd.Series(district).map(lambda d: f"District {d}"),
+        "biometric_intensity": intensity,
+        "CIIM": ciim,
+    })
+
+
+def bit_equal(a, b):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    nan_a, nan_b = np.isnan(a), np.isnan(b)
+    return np.array_equal(nan_a, nan_b) and np.array_equal(a[~nan_a].view(np.int64), b[~nan_b].view(np.int64))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--districts", type=int, default=700)
+    args = parser.parse_args()
+
+    df = synthetic_table(args.rows, args.districts)
+
+    started = time.perf_counter()
+    expected = reference(df)
+    reference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = kernels(df)
+    kernel_seconds = time.perf_counter() - started
+
+    mismatched = [col for col in expected if not bit_equal(expected[col], actual[col])]
+
+    print(f"rows={args.rows:,} districts={args.districts:,}")
+    print(f"  pandas groupby/apply : {reference_seconds:8.3f}s")
+    print(f"  segment kernels      : {kernel_seconds:8.3f}s  ({reference_seconds / kernel_seconds:,.0f}x)")
+    if mismatched:
+        print(f"  ❌ output differs in: {', '.join(mismatched)}")
+        sys.exit(1)
+    print("  ✅ bit-for-bit identical output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Offline benchmark suite for the ingest pipeline and the risk API.
+
+Every stage runs in a fresh process so its peak RSS is measured in
+isolation. Results are written as JSON (one record per stage/endpoint)
+that can be diffed between versions with --compare.
+
+    python -m benchmarks.run --scale 10 --out bench_results.json
+    python -m benchmarks.run --data /tmp/aadhaar-bench --compare old.json
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+FEEDS = ["api_data_aadhar_biometric", "api_data_aadhar_enrolment", "api_data_aadhar_demographic"]
+
+# Imported before a stage starts so import time and memory are not charged to it
+PRELOAD = ["pandas", "numpy", "pyarrow.parquet", "backend.data_access.snapshot", "ml.feature_builder"]
+
+
+def _maxrss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# -----------------------------------
+# PIPELINE STAGES (return rows processed)
+# -----------------------------------
+def stage_load(feed):
+    from backend.data_access.loader import load_folder
+    return len(load_folder(feed))
+
+
+def stage_build_features():
+    from backend.data_access.store import read_manifest
+    from ml.feature_builder import build_features
+    build_features()
+    return read_manifest()["tables"]["risk"]["rows"]
+
+
+def stage_snapshot_load():
+    from backend.data_access.snapshot import SnapshotService
+    return len(SnapshotService().get().frame)
+
+
+def pipeline_stages():
+    stages = [(f"load:{feed}", stage_load, (feed,)) for feed in FEEDS]
+    stages.append(("build_features", stage_build_features, ()))
+    stages.append(("snapshot_load", stage_snapshot_load, ()))
+    return stages
+
+
+# -----------------------------------
+# ENDPOINTS (path, params) - resolved against the built snapshot
+# -----------------------------------
+def endpoint_cases(snapshot):
+    date = snapshot.dates[-1]
+    district = snapshot.frame["district"].iloc[0]
+    state = snapshot.frame["state"].iloc[0]
+    return [
+        ("risk_map", "/api/v1/risk/map", {"date": date}),
+        ("risk_map_top", "/api/v1/risk/map", {"date": date, "sort": "CIIM desc", "limit": 200}),
+        ("risk_map_lod", "/api/v1/risk/map/lod", {"date": date, "zoom": 5}),
+        ("district_risk", f"/api/v1/risk/district/{district}", {}),
+        ("district_history", f"/api/v1/risk/district/{state}/{district}/history", {"resample": "quarter"}),
+        ("simulate", "/api/v1/risk/simulate", {"date": date, "scenario": ["OTP", "OTP+FACE", "MOBILE"]}),
+    ]
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _time_endpoint(client, name, path, params, requests, cold):
+    from backend.api.cache import response_cache
+
+    latencies, size = [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        if cold:
+            response_cache.clear()
+        t0 = time.perf_counter()
+        response = client.get(path, params=params)
+        latencies.append(time.perf_counter() - t0)
+        size = len(response.content)
+    total = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "kind": "endpoint",
+        "name": name,
+        "requests": requests,
+        "status": response.status_code,
+        "wall_s": total,
+        "requests_per_s": requests / total,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "response_bytes": size,
+        "peak_rss_mb": _maxrss_mb(),
+    }
+
+
+def run_endpoints(requests):
+    """
+    Time every endpoint case twice: with the response cache cleared before
+    each request (filtering and encoding, comparable across versions) and
+    as "<name>:cached" repeat hits.
+    """
+    from fastapi.testclient import TestClient
+    from backend.data_access.snapshot import snapshot_service
+    from backend.main import app
+
+    results = []
+    with TestClient(app) as client:
+        for name, path, params in endpoint_cases(snapshot_service.get()):
+            client.get(path, params=params)  # warm-up
+            results.append(_time_endpoint(client, name, path, params, requests, cold=True))
+            client.get(path, params=params)  # fill the cache
+            results.append(_time_endpoint(client, f"{name}:cached", path, params, requests, cold=False))
+    return results
+
+
+# -----------------------------------
+# ISOLATED EXECUTION
+# -----------------------------------
+def _child(workdir, target, args, queue):
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+    try:
+        for module in PRELOAD:
+            importlib.import_module(module)
+        baseline = _maxrss_mb()
+        started_wall, started_cpu = time.perf_counter(), time.process_time()
+        value = target(*args)
+        queue.put({
+            "value": value,
+            "wall_s": time.perf_counter() - started_wall,
+            "cpu_s": time.process_time() - started_cpu,
+            "peak_rss_mb": _maxrss_mb(),
+            "peak_delta_mb": _maxrss_mb() - baseline,
+        })
+    except Exception as e:  # reported, not raised, so the suite keeps going
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def isolated(workdir, target, *args):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(workdir, target, args, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def run_suite(workdir, requests):
+    results = []
+    for name, target, args in pipeline_stages():
+        print(f"  ▶ {name}")
+        r = isolated(workdir, target, *args)
+        record = {"kind": "stage", "name": name}
+        if "error" in r:
+            record["error"] = r["error"]
+        else:
+            rows = r.pop("value")
+            record.update(r, rows=rows, rows_per_s=rows / r["wall_s"] if r["wall_s"] else None)
+        results.append(record)
+
+    print("  ▶ endpoints")
+    r = isolated(workdir, run_endpoints, requests)
+    if "error" in r:
+        results.append({"kind": "endpoint", "name": "*", "error": r["error"]})
+    else:
+        results.extend(r["value"])
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current, previous_path):
+    with open(previous_path) as f:
+        previous = {(r["kind"], r["name"]): r for r in json.load(f)["results"]}
+    print(f"\nComparison against {previous_path} (wall time, new / old):")
+    for r in current:
+        old = previous.get((r["kind"], r["name"]))
+        if old and "wall_s" in old and "wall_s" in r:
+            print(f"  {r['name']:<40} {r['wall_s']:9.3f}s  vs {old['wall_s']:9.3f}s  ({r['wall_s'] / old['wall_s']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aadhaar risk engine benchmark suite")
+    parser.add_argument("--scale", type=float, default=1.0, help="synthetic data size, multiple of the sample")
+    parser.add_argument("--data", help="existing root with data/raw/... (skips generation)")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import generate
+
+    workdir = args.data or tempfile.mkdtemp(prefix="aadhaar-bench-")
+    results = []
+    if not args.data:
+        print(f"Generating synthetic data (scale {args.scale:g}) in {workdir}")
+        started = time.perf_counter()
+        written = generate(workdir, args.scale)
+        results.append({
+            "kind": "stage", "name": "generate",
+            "wall_s": time.perf_counter() - started,
+            "rows": sum(written.values()),
+        })
+
+    print("Running benchmarks...")
+    results.extend(run_suite(workdir, args.requests))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": None if args.data else args.scale,
+            "data": workdir,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        if "error" in r:
+            print(f"  ❌ {r['name']}: {r['error']}")
+        elif r["kind"] == "stage":
+            peak = f"{r['peak_delta_mb']:8.1f} MB" if "peak_delta_mb" in r else ""
+            print(f"  {r['name']:<40} {r['wall_s']:9.3f}s  {r.get('rows', 0):>12,} rows  {peak}")
+        else:
+            print(f"  {r['name']:<40} p50 {r['p50_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  {r['response_bytes']:>10,} B")
+    print(f"📁 Results written to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Synthetic Aadhaar raw shards for benchmarking.
+
+Writes `data/raw/api_data_aadhar_{biometric,enrolment,demographic}/*_<start>_<end>.csv`
+under a target root with the same columns, date format and key layout as
+the real feeds. Scale 1 roughly matches the committed sample shards
+(~72k demographic rows); the national geography (states, ~770 districts,
+~19k pincodes) is fixed, so larger scales add pincodes up to the national
+count and then extend the date range, like real monthly drops do.
+
+    python -m benchmarks.synthetic --root /tmp/aadhaar-bench --scale 10
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.data_access.loader import SCHEMAS
+
+SAMPLE_ROWS = 72_000          # demographic rows in the committed sample
+NATIONAL_DISTRICTS = 770
+NATIONAL_PINCODES = 19_000
+SHARD_ROWS = 500_000          # rows per generated shard file
+START_DATE = "2023-01-01"
+GEO_PATH = "data/geo/district_lat_lon.csv"
+
+STATES = [
+    "Andaman and Nicobar Islands", "Andhra Pradesh", "Arunachal Pradesh", "Assam",
+    "Bihar", "Chandigarh", "Chhattisgarh", "Dadra and Nagar Haveli and Daman and Diu",
+    "Delhi", "Goa", "Gujarat", "Haryana", "Himachal Pradesh", "Jammu and Kashmir",
+    "Jharkhand", "Karnataka", "Kerala", "Ladakh", "Lakshadweep", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha",
+    "Puducherry", "Punjab", "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana",
+    "Tripura", "Uttar Pradesh", "Uttarakhand", "West Bengal",
+]
+
+# Share of the key universe each feed reports (enrolment is the sparse one)
+FEED_COVERAGE = {
+    "api_data_aadhar_biometric": 1.0,
+    "api_data_aadhar_enrolment": 0.6,
+    "api_data_aadhar_demographic": 1.0,
+}
+
+# Mean of each count column (negative binomial, so heavy right tail)
+COUNT_MEANS = {
+    "bio_age_5_17": 6.0,
+    "bio_age_17_": 30.0,
+    "age_0_5": 3.6,
+    "age_5_17": 3.5,
+    "age_18_greater": 40.0,
+    "demo_age_5_17": 1.3,
+    "demo_age_17_": 12.4,
+}
+
+
+def geography(seed=0):
+    """(state, district, pincode) for the national pincode universe."""
+    rng = np.random.default_rng(seed)
+
+    if os.path.exists(GEO_PATH):
+        names = pd.read_csv(GEO_PATH)["district"].astype(str).str.title().tolist()
+    else:
+        names = []
+    names = (names + [f"District {i:03d}" for i in range(NATIONAL_DISTRICTS)])[:NATIONAL_DISTRICTS]
+
+    district_state = rng.integers(0, len(STATES), NATIONAL_DISTRICTS)
+    # Skewed pincode counts per district, like the real feed (median ~20, max ~150)
+    weights = rng.lognormal(0, 0.8, NATIONAL_DISTRICTS)
+    pin_district = rng.choice(NATIONAL_DISTRICTS, NATIONAL_PINCODES, p=weights / weights.sum())
+    pincodes = rng.choice(np.arange(110_000, 856_000), NATIONAL_PINCODES, replace=False)
+
+    return pd.DataFrame({
+        "state": np.asarray(STATES, dtype=object)[district_state[pin_district]],
+        "district": np.asarray(names, dtype=object)[pin_district],
+        "pincode": pincodes.astype(np.int32),
+    }).sort_values(["state", "district", "pincode"], ignore_index=True)
+
+
+def plan(scale):
+    """Number of active pincodes per date and number of dates for a scale."""
+    rows = int(SAMPLE_ROWS * scale)
+    pincodes = min(NATIONAL_PINCODES, max(500, int(4_000 * np.sqrt(scale))))
+    dates = max(2, int(np.ceil(rows / pincodes)))
+    return pincodes, dates
+
+
+def _counts(rng, n, mean):
+    # Negative binomial with dispersion 1: mean `mean`, long tail
+    return rng.negative_binomial(1, 1 / (1 + mean), n).astype(np.int32)
+
+
+def generate(root, scale=1.0, seed=0, shard_rows=SHARD_ROWS):
+    """
+    Write synthetic shards for all three feeds under `root`.
+
+    Generation streams date by date, so memory stays bounded by one shard.
+    Returns {folder: rows written}.
+    """
+    geo = geography(seed)
+    pincodes, n_dates = plan(scale)
+    dates = pd.date_range(START_DATE, periods=n_dates, freq="D").strftime("%d-%m-%Y")
+    active = geo.sample(n=pincodes, random_state=seed).sort_index()
+
+    written = {}
+    for f_index, (folder, columns) in enumerate(SCHEMAS.items()):
+        rng = np.random.default_rng(seed + 1 + f_index)
+        out_dir = os.path.join(root, "data", "raw", folder)
+        os.makedirs(out_dir, exist_ok=True)
+
+        buffer, buffered, offset = [], 0, 0
+
+        def flush():
+            nonlocal buffer, buffered, offset
+            shard = pd.concat(buffer, ignore_index=True)
+            path = os.path.join(out_dir, f"{folder}_{offset}_{offset + len(shard) - 1}.csv")
+            shard.to_csv(path, index=False)
+            offset += len(shard)
+            buffer, buffered = [], 0
+
+        for date in dates:
+            keys = active[rng.random(len(active)) < FEED_COVERAGE[folder]]
+            day = pd.DataFrame({"date": date, **{c: keys[c].to_numpy() for c in keys.columns}})
+            for col in columns:
+                day[col] = _counts(rng, len(day), COUNT_MEANS[col])
+            buffer.append(day)
+            buffered += len(day)
+            if buffered >= shard_rows:
+                flush()
+        if buffer:
+            flush()
+        written[folder] = offset
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Aadhaar raw shards")
+    parser.add_argument("--root", required=True, help="directory that receives data/raw/...")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of the sample size (1, 10, 100, 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS)
+    args = parser.parse_args()
+
+    pincodes, n_dates = plan(args.scale)
+    print(f"Generating scale {args.scale:g}: {pincodes:,} pincodes x {n_dates:,} dates")
+    for folder, rows in generate(args.root, args.scale, args.seed, args.shard_rows).items():
+        print(f"  {folder}: {rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ from plotly.subplots import make_subplots
 import numpy as np
 
 from ml.action_simulator import simulate
+from ml.policy_rules import RECOMMENDATION_RULES, THRESHOLDS, matching, risk_levels
+from frontend.data import dataset_version, load_dates, load_lod, load_slice, load_states
 
 
 st.set_page_config(
@@ -49,16 +51,14 @@ st.markdown('<h1 class="main-header">🛡️ Aadhaar Digital Identity Risk & Fai
 st.caption("**Early warning system for Aadhaar access risks across India** - Real-time district-level risk monitoring")
 
 API = "http://127.0.0.1:8000/api/v1"
+MAP_LOD_ZOOM = 5  # ~1° grid cells for the national density view
 
 with st.sidebar:
     st.header("⚙️ Dashboard Controls")
     
-    # Load data once
-    if 'df' not in st.session_state:
-        st.session_state.df = pd.read_csv("data/processed/merged_aadhaar.csv")
-    
-    df = st.session_state.df
-    dates = sorted(df["date"].astype(str).unique()) if not df.empty else []
+    # Shared, version-keyed cache: only the selected slice is loaded
+    version = dataset_version()
+    dates = load_dates(version) if version else []
     
     if dates:
         selected_date = st.selectbox(
@@ -69,7 +69,7 @@ with st.sidebar:
         )
         
         # State filter
-        states = sorted(df["state"].dropna().unique()) if "state" in df.columns else []
+        states = load_states(version)
         if states:
             selected_state = st.selectbox(
                 "🏛️ Filter by State (Optional)",
@@ -78,30 +78,31 @@ with st.sidebar:
             )
         else:
             selected_state = "All States"
+
+        map_detail = st.radio(
+            "🗺️ Map Detail",
+            options=["Districts", "Density Grid"],
+            help="Density Grid shows precomputed cells (count, mean/max CIIM) for the national view"
+        )
     else:
         st.error("No data available. Please run feature_builder.py first.")
         st.stop()
 
-# Use direct data access for better performance
-data = df[df["date"] == selected_date].copy()
+# District rollup for the selected month (and state), from the shared cache
+data = load_slice(version, selected_date, None if selected_state == "All States" else selected_state)
 
 if data.empty:
-    st.warning("⚠️ No Aadhaar data available for this date.")
-    st.stop()
-
-# Filter by state if selected
-if selected_state != "All States":
-    data = data[data["state"] == selected_state].copy()
-    if data.empty:
+    if selected_state != "All States":
         st.warning(f"⚠️ No data available for {selected_state} on {selected_date}.")
-        st.stop()
+    else:
+        st.warning("⚠️ No Aadhaar data available for this date.")
+    st.stop()
 
-# Merge geo data
-try:
-    geo = pd.read_csv("data/geo/district_lat_lon.csv")
-    data = data.merge(geo, on="district", how="left")
-except Exception as e:
-    st.warning(f"⚠️ Could not load geographic data: {e}")
+# Coordinates are attached to the district table at build time
+if "lat" not in data.columns:
+    st.warning("⚠️ No coordinates in the risk store - rebuild with ml/feature_builder.py")
+    data["lat"] = np.nan
+    data["lon"] = np.nan
 
 st.markdown("---")
 col1, col2, col3, col4 = st.columns(4)
@@ -114,15 +115,20 @@ with col2:
     avg_ciim = data["CIIM"].mean() if "CIIM" in data.columns else 0
     st.metric("📊 Avg CIIM Score", f"{avg_ciim*100:.1f}", delta=None, help="Average risk score across all districts")
 
+# Risk levels come from the shared rule table (ml/policy_rules.py)
+levels = risk_levels(data) if "CIIM" in data.columns else pd.Series(dtype=object)
+emergency_pct = THRESHOLDS["emergency_ciim"] * 100
+high_pct = THRESHOLDS["high_ciim"] * 100
+
 with col3:
-    critical_count = len(data[data["CIIM"] > 0.7]) if "CIIM" in data.columns else 0
-    st.metric("🔴 Critical Districts", f"{critical_count}", 
-              delta=f"{critical_count - len(data[data['CIIM'] > 0.7])}" if critical_count > 0 else None,
-              help="Districts with CIIM > 70 (Emergency level)")
+    critical_count = int((levels == "CRITICAL").sum())
+    st.metric("🔴 Critical Districts", f"{critical_count}",
+              help=f"Districts with CIIM > {emergency_pct:.0f} (Emergency level)")
 
 with col4:
-    high_risk_count = len(data[(data["CIIM"] > 0.5) & (data["CIIM"] <= 0.7)]) if "CIIM" in data.columns else 0
-    st.metric("🟠 High Risk Districts", f"{high_risk_count}", help="Districts with CIIM 50-70")
+    high_risk_count = int((levels == "HIGH").sum())
+    st.metric("🟠 High Risk Districts", f"{high_risk_count}",
+              help=f"Districts with CIIM {high_pct:.0f}-{emergency_pct:.0f}")
 
 st.markdown("---")
 
@@ -142,8 +148,38 @@ if "CIIM" in data.columns:
     
     # Filter out rows without coordinates
     map_data = data.dropna(subset=["lat", "lon"]).copy()
-    
-    if not map_data.empty:
+
+    # National density view: precomputed grid cells instead of one marker per district
+    use_grid = map_detail == "Density Grid" and selected_state == "All States"
+    cells = load_lod(version, selected_date, MAP_LOD_ZOOM) if use_grid else None
+
+    if cells is not None and not cells.empty:
+        fig_map = px.scatter_map(
+            cells,
+            lat="lat",
+            lon="lon",
+            color="CIIM_mean",
+            size="count",
+            hover_data={
+                "count": True,
+                "CIIM_mean": ":.2f",
+                "CIIM_max": ":.2f",
+                "citizens_at_risk": ":,.0f"
+            },
+            zoom=4.2,
+            map_style="carto-positron",
+            color_continuous_scale=[(0, "green"), (0.5, "yellow"), (1, "red")],
+            range_color=(0, 1),
+            labels={"CIIM_mean": "Mean Risk Score", "count": "Pincodes"},
+            title="Aadhaar Identity Access Risk Map - Density Grid"
+        )
+        fig_map.update_layout(
+            height=600,
+            margin=dict(l=0, r=0, t=40, b=0),
+            coloraxis_colorbar=dict(title="Mean CIIM", tickmode="linear", tick0=0, dtick=0.2)
+        )
+        st.plotly_chart(fig_map, use_container_width=True)
+    elif not map_data.empty:
         # Create improved map with custom colors
         fig_map = px.scatter_map(
             map_data,
@@ -189,15 +225,20 @@ else:
 st.markdown("---")
 st.markdown("## 📍 District-Level Deep Dive Analysis")
 
-# District selector with improved UI
-districts_available = sorted(data["district"].dropna().unique())
+# District selector with improved UI. Options are (state, district) pairs:
+# the same district name exists in several states (Aurangabad, Bilaspur, ...)
+districts_available = sorted(
+    data[["state", "district"]].dropna().astype(str).drop_duplicates().itertuples(index=False, name=None),
+    key=lambda pair: (pair[1], pair[0])
+)
 if districts_available:
     col_sel1, col_sel2 = st.columns([3, 1])
     
     with col_sel1:
-        district = st.selectbox(
+        selected_pair = st.selectbox(
             "🔍 Select District for Detailed Analysis",
             districts_available,
+            format_func=lambda pair: pair[1] if selected_state != "All States" else f"{pair[1]} ({pair[0]})",
             help="Choose a district to view comprehensive risk analysis and recommendations"
         )
     
@@ -205,7 +246,8 @@ if districts_available:
         # Show district count
         st.metric("Available Districts", len(districts_available))
     
-    row = data[data["district"] == district].iloc[0]
+    district_state, district = selected_pair
+    row = data[(data["state"].astype(str) == district_state) & (data["district"].astype(str) == district)].iloc[0]
 else:
     st.error("No districts available in current selection.")
     st.stop()
@@ -387,7 +429,9 @@ with tab3:
     ciim = float(row.get("CIIM", 0))
     child_ratio = float(row.get("child_bio_ratio", 0))
     bio_growth = float(row.get("bio_growth", 0))
-    data_quality = row.get("data_quality_flag", "OK")
+    # The district rollup counts member pincodes whose data quality flag is not OK
+    flagged_pincodes = int(row.get("flagged_pincodes", 0))
+    pincodes = int(row.get("pincodes", 0))
     biometric_intensity = float(row.get("biometric_intensity", 0))
     growth_direction = row.get("growth_direction", "STABLE")
 
@@ -396,19 +440,28 @@ with tab3:
     "EMERGENCY": {
         "icon": "🔴",
         "label": "Emergency Intervention Required",
-        "description": "Critical risk level (CIIM > 0.7). Immediate UIDAI and State Government action needed.",
+        "description": (
+            f"Critical risk level (CIIM > {THRESHOLDS['emergency_ciim']}). "
+            "Immediate UIDAI and State Government action needed."
+        ),
         "color": "error"
     },
     "PROTECT_CHILDREN": {
         "icon": "🟠",
         "label": "Protect Children Priority",
-        "description": "High child biometric dependency (>10%). Enable non-biometric alternatives for children.",
+        "description": (
+            f"High child biometric dependency (>{THRESHOLDS['protect_children_ratio']:.0%}). "
+            "Enable non-biometric alternatives for children."
+        ),
         "color": "warning"
     },
     "AUDIT_EXPANSION": {
         "icon": "🟡",
         "label": "Audit Rapid Expansion",
-        "description": "Rapid biometric growth (>30% in 3 months). Review enrollment practices and device quality.",
+        "description": (
+            f"Rapid biometric growth (>{THRESHOLDS['audit_growth']:.0%} in 3 months). "
+            "Review enrollment practices and device quality."
+        ),
         "color": "warning"
     },
     "DATA_REVIEW": {
@@ -433,24 +486,19 @@ with tab3:
         st.markdown(f"### {flag_info['icon']} Policy Action Status: {flag_info['label']}")
         st.write(flag_info['description'])
     with col_policy2:
-        if data_quality != "OK":
-            st.warning(f"⚠️ Data Quality: {data_quality}")
+        if flagged_pincodes > 0:
+            st.warning(f"⚠️ Data Quality: {flagged_pincodes} of {pincodes} pincodes flagged for review")
 
     st.markdown("---")
 
     # Risk level with context
-    if ciim > 0.7:
-        risk_level = "🔴 CRITICAL"
-        risk_desc = "District faces severe risk of identity access failures"
-    elif ciim > 0.5:
-        risk_level = "🟠 HIGH"
-        risk_desc = "District requires attention and preventive measures"
-    elif ciim > 0.3:
-        risk_level = "🟡 MEDIUM"
-        risk_desc = "District should be monitored regularly"
-    else:
-        risk_level = "🟢 LOW"
-        risk_desc = "District has manageable risk levels"
+    risk_level_display = {
+        "CRITICAL": ("🔴 CRITICAL", "District faces severe risk of identity access failures"),
+        "HIGH": ("🟠 HIGH", "District requires attention and preventive measures"),
+        "MEDIUM": ("🟡 MEDIUM", "District should be monitored regularly"),
+        "LOW": ("🟢 LOW", "District has manageable risk levels"),
+    }
+    risk_level, risk_desc = risk_level_display[risk_levels(pd.DataFrame({"CIIM": [ciim]}))[0]]
 
     st.markdown(f"### Overall Risk Level: {risk_level}")
     st.caption(risk_desc)
@@ -536,51 +584,58 @@ with tab4:
     ciim = float(row.get("CIIM", 0))
     growth_direction = row.get("growth_direction", "STABLE")
 
-    recommendations = []
-
-    # 🔴 CRITICAL RISK
-    if ciim > 0.6:
-        recommendations.append({
+    # Which recommendations apply is decided by the shared rule table
+    # (ml/policy_rules.py); the wording lives here
+    recommendation_text = {
+        # 🔴 CRITICAL RISK
+        "CRITICAL_COORDINATION": {
             "priority": "🔴 HIGH",
             "action": "Immediate UIDAI and State Government coordination",
             "details": (
                 "District faces critical Aadhaar access risk. "
                 "Immediate coordination required for technical, policy, and field-level intervention."
             )
-        })
-
-    # 👶 CHILD PROTECTION
-    if child_ratio > 0.3:
-        recommendations.append({
+        },
+        # 👶 CHILD PROTECTION
+        "CHILD_ALTERNATIVES": {
             "priority": "🟠 HIGH",
             "action": "Enable non-biometric Aadhaar options for children",
             "details": (
                 f"{child_ratio*100:.1f}% of biometric users are children. "
                 "Enable OTP-based authentication, face authentication, and assisted modes."
             )
-        })
-
-    # 🧾 BIOMETRIC DEPENDENCY
-    if biometric_intensity > 0.6:
-        recommendations.append({
+        },
+        # 🧾 BIOMETRIC DEPENDENCY
+        "ASSISTED_CENTERS": {
             "priority": "🟠 HIGH",
             "action": "Expand assisted Aadhaar centers and offline KYC",
             "details": (
                 f"{biometric_intensity*100:.1f}% of citizens depend on biometrics. "
                 "Increase assisted centers and offline authentication facilities."
             )
-        })
-
-    # 📈 RAPID EXPANSION
-    if bio_growth > 0.05 and growth_direction == "INCREASING":
-        recommendations.append({
+        },
+        # 📈 RAPID EXPANSION
+        "AUDIT_EXPANSION": {
             "priority": "🟡 MEDIUM",
             "action": "Audit biometric expansion and enrollment practices",
             "details": (
                 f"Biometric dependency growing at {bio_growth*100:.1f}% per month. "
                 "Audit devices, operators, and fallback availability."
             )
-        })
+        },
+    }
+    district_inputs = pd.DataFrame({
+        "CIIM": [ciim],
+        "child_bio_ratio": [child_ratio],
+        "biometric_intensity": [biometric_intensity],
+        "bio_growth": [bio_growth],
+        "growth_direction": [growth_direction],
+    })
+    recommendations = [
+        recommendation_text[label]
+        for label, applies in matching(district_inputs, RECOMMENDATION_RULES).items()
+        if applies[0]
+    ]
 
     # ✅ DEFAULT SAFE STATE
     if not recommendations:
@@ -0,0 +1,57 @@
+"""
+Dashboard data layer.
+
+Slices of the district rollup are cached once per Streamlit process (not per
+browser session) and keyed by the dataset version stamped into the store
+manifest, so a rebuild invalidates them and every analyst shares the same
+copy. Only the selected month (and state) is read from the columnar store,
+and coordinates already come attached by the feature build.
+"""
+import streamlit as st
+
+from backend.data_access.store import STORE_PATH, list_dates, read_manifest, read_store
+from ml.rollups import LOD_TABLE
+
+TABLE = "district"
+MAX_CACHED_SLICES = 64
+
+
+def dataset_version(path=STORE_PATH):
+    """Current dataset version, or None if the store has not been built."""
+    try:
+        manifest = read_manifest(path)
+    except FileNotFoundError:
+        return None
+    # Stores built before versions were stamped change updated_at on every write
+    return manifest.get("version") or manifest["updated_at"]
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_dates(version, path=STORE_PATH):
+    return list_dates(path, table=TABLE)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_states(version, path=STORE_PATH):
+    states = read_store(path, table=TABLE, columns=["state"])["state"]
+    return sorted(states.dropna().astype(str).unique())
+
+
+@st.cache_data(max_entries=MAX_CACHED_SLICES, show_spinner=False)
+def load_slice(version, date, state=None, path=STORE_PATH):
+    """District rows for one date (and optionally one state)."""
+    df = read_store(path, table=TABLE, dates=[date])
+    if state is not None:
+        df = df[df["state"] == state]
+    df = df.reset_index(drop=True)
+    df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    return df
+
+
+@st.cache_data(max_entries=MAX_CACHED_SLICES, show_spinner=False)
+def load_lod(version, date, zoom, path=STORE_PATH):
+    """Precomputed map cells for one date and LOD zoom, or None if the build had no coordinates."""
+    if LOD_TABLE not in read_manifest(path)["tables"]:
+        return None
+    df = read_store(path, table=LOD_TABLE, dates=[date])
+    return df[df["zoom"] == zoom].reset_index(drop=True)
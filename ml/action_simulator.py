@@ -1,3 +1,25 @@
+import numpy as np
+
+from ml.ciim import CIIM_WEIGHTS
+
+# Action -> (input it dampens, multiplier)
+ACTIONS = {
+    "OTP": ("biometric_intensity", 0.7),
+    "FACE": ("child_bio_ratio", 0.6),
+    "OFFLINE": ("biometric_intensity", 0.8),
+    "MOBILE": ("bio_growth", 0.5),
+}
+
+
+def _ciim(b, c, g):
+    # The build's CIIM weights; exclusion risk is child_bio_ratio * intensity
+    return (
+        CIIM_WEIGHTS["biometric_intensity"] * b
+        + CIIM_WEIGHTS["growth_penalty"] * g
+        + CIIM_WEIGHTS["exclusion_risk"] * (c * b)
+    )
+
+
 def simulate(row, action):
     b = row["biometric_intensity"]
     c = row["child_bio_ratio"]
@@ -12,5 +34,52 @@ def simulate(row, action):
     if action == "MOBILE":
         g *= 0.5
 
-    new_ciim = 0.5*b + 0.3*g + 0.2*(c*b)
+    new_ciim = _ciim(b, c, g)
     return new_ciim
+
+
+def parse_scenario(scenario):
+    """
+    Normalize a scenario to a tuple of actions.
+
+    Accepts a single action ("OTP"), a "+"-joined combination ("OTP+FACE")
+    or an iterable of actions. An empty scenario or "NONE" means "no
+    intervention".
+    """
+    if isinstance(scenario, str):
+        scenario = scenario.split("+")
+    actions = tuple(a.strip().upper() for a in scenario if a.strip().upper() not in ("", "NONE"))
+    unknown = [a for a in actions if a not in ACTIONS]
+    if unknown:
+        raise ValueError(f"Unknown action(s): {', '.join(unknown)} (expected {', '.join(ACTIONS)})")
+    return actions
+
+
+def simulate_batch(df, scenarios):
+    """
+    Simulated CIIM for every row of `df` under every scenario.
+
+    Returns a (len(df), len(scenarios)) float array. A single-action
+    scenario gives exactly the same value as `simulate(row, action)`;
+    combined actions compound their multipliers.
+    """
+    scenarios = [parse_scenario(s) for s in scenarios]
+    inputs = {
+        col: df[col].to_numpy(dtype=np.float64)[:, None]
+        for col in ("biometric_intensity", "child_bio_ratio", "bio_growth")
+    }
+
+    # Apply multipliers in the same order as simulate(); x * 1.0 is exact,
+    # so scenarios without an action are left untouched
+    for action, (col, factor) in ACTIONS.items():
+        factors = np.array([factor if action in s else 1.0 for s in scenarios])
+        inputs[col] = inputs[col] * factors
+
+    b = inputs["biometric_intensity"]
+    c = inputs["child_bio_ratio"]
+    g = inputs["bio_growth"]
+    return _ciim(b, c, g)
+
+
+def scenario_name(scenario):
+    return "+".join(parse_scenario(scenario)) or "NONE"
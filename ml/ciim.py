@@ -0,0 +1,8 @@
+"""
+CIIM component weights, shared by the feature build, the API snapshot and
+the simulator without importing the build pipeline.
+"""
+
+# CIIM = weighted sum of these components, clipped to [0, 1]
+# (growth_penalty is bio_growth counted only when positive)
+CIIM_WEIGHTS = {"biometric_intensity": 0.5, "growth_penalty": 0.3, "exclusion_risk": 0.2}
@@ -1,9 +1,46 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
 import pandas as pd
 import numpy as np
 from backend.data_access.loader import (
-    load_biometric,
-    load_enrolment,
-    load_demographic
+    BASE_PATH,
+    SCHEMAS,
+    concat_frames,
+    date_range,
+    empty_feed,
+    load_folder,
+    read_shard,
+    shard_key
+)
+from backend.data_access.store import (
+    STORE_PATH,
+    list_dates,
+    open_manifest,
+    publish_manifest,
+    read_manifest,
+    read_store,
+    update_manifest,
+    write_partitions
+)
+from ml.ciim import CIIM_WEIGHTS
+from ml.geo import attach_coordinates, load_coordinates
+from ml.join import join_feeds
+from ml.out_of_core import BATCH_FREQ, cleanup, spill_feeds
+from ml.policy_rules import policy_flags
+from ml.profiling import StageProfiler
+from ml.rollups import build_rollups
+from ml.ts_kernels import grouped_diff, grouped_rolling_mean, grouped_trend, segment_offsets
+from ml.incremental import (
+    TAIL_COLUMNS,
+    changed_sources,
+    load_tail_state,
+    may_hold_dates,
+    save_tail_state,
+    scan_sources,
+    tail_state,
+    with_date_ranges
 )
 
 # -----------------------------------
@@ -14,32 +51,40 @@ MAX_TTF = 24          # stable upper bound
 MIN_ENROLLMENT = 100  # minimum enrollments for reliable metrics
 ROLLING_WINDOW = 3    # months for rolling average smoothing
 
+CSV_OUTPUT_PATH = "data/processed/merged_aadhaar.csv"
 
-def build_features():
-    print("Loading Aadhaar datasets...")
-
-    bio = load_biometric()
-    enr = load_enrolment()
-    demo = load_demographic()
 
+def _standardize(bio, enr, demo):
     # -----------------------------------
     # STANDARDIZE KEYS
     # -----------------------------------
+    # District names are title-cased per dictionary entry inside the join
     for df in [bio, enr, demo]:
-        df["district"] = df["district"].str.strip().str.title()
         df["date"] = pd.to_datetime(df["date"], dayfirst=True, errors="coerce")
 
     bio = bio.dropna(subset=["date"])
     enr = enr.dropna(subset=["date"])
     demo = demo.dropna(subset=["date"])
+    return bio, enr, demo
+
 
+def _merge(bio, enr, demo):
     # -----------------------------------
-    # MERGE DATASETS
+    # MERGE DATASETS (PACKED INTEGER KEYS)
     # -----------------------------------
     print("Merging datasets...")
-    df = bio.merge(enr, on=["date", "district", "pincode"], how="inner")
-    df = df.merge(demo, on=["date", "district", "pincode"], how="inner")
+    return join_feeds(bio, enr, demo)
+
+
+def _assign_series(df, col, values):
+    values = pd.Series(values, index=df.index)
+    # Tail rows carried over from a previous run keep their stored values
+    if "_tail" in df.columns:
+        values = values.where(~df["_tail"], df[f"_tail_{col}"])
+    df[col] = values
 
+
+def _base_indicators(df):
     print("Building biometric dependency indicators...")
 
     # -----------------------------------
@@ -59,26 +104,26 @@ def build_features():
     removed_count = initial_count - len(df)
     if removed_count > 0:
         print(f"  Removed {removed_count} rows with invalid enrollment/biometric data")
-    
+
     # -----------------------------------
     # BIOMETRIC INTENSITY (CALCULATE BEFORE QUALITY CHECKS)
     # -----------------------------------
     df["biometric_intensity"] = df["total_bio"] / df["total_enrolled"]
     df["biometric_intensity"] = df["biometric_intensity"].clip(0, 1)
-    
+
     # -----------------------------------
     # DATA QUALITY FLAGS (AFTER INTENSITY CALCULATION)
     # -----------------------------------
     # Flag districts with very small enrollment (unreliable metrics)
     df["has_sufficient_data"] = df["total_enrolled"] >= MIN_ENROLLMENT
-    
+
     # Flag suspicious data patterns (100% biometric intensity is unrealistic)
     # Also flag if biometrics exceed enrolled (data inconsistency)
     df["data_quality_flag"] = "OK"
     df.loc[df["biometric_intensity"] > 0.99, "data_quality_flag"] = "SUSPICIOUS"
     df.loc[df["total_bio"] > df["total_enrolled"], "data_quality_flag"] = "DATA_INCONSISTENT"
     df.loc[~df["has_sufficient_data"], "data_quality_flag"] = "INSUFFICIENT_DATA"
-    
+
     # Log data quality issues
     suspicious_count = (df["data_quality_flag"] == "SUSPICIOUS").sum()
     insufficient_count = (df["data_quality_flag"] == "INSUFFICIENT_DATA").sum()
@@ -92,33 +137,32 @@ def build_features():
     # -----------------------------------
     df["child_bio_ratio"] = df["bio_age_5_17"] / df["total_bio"]
     df["child_bio_ratio"] = df["child_bio_ratio"].clip(0, 1)
+    return df
+
 
+def _growth_indicators(df):
     # -----------------------------------
     # BIOMETRIC GROWTH (STABILIZED WITH ROLLING AVERAGE) - OPTIMIZED
     # -----------------------------------
-    # Sort once for efficient groupby operations
+    # Sort once; every district is then one contiguous segment
     df = df.sort_values(["district", "date"]).copy()
-    
-    # Calculate month-to-month change (raw growth) - optimized vectorized operation
-    df["bio_growth_raw"] = df.groupby("district")["biometric_intensity"].diff()
-    df["bio_growth_raw"] = df["bio_growth_raw"].fillna(0)
-    
+    offsets = segment_offsets(df["district"].to_numpy())
+
+    # Calculate month-to-month change (raw growth) - segment-wise kernel
+    _assign_series(df, "bio_growth_raw", np.nan_to_num(grouped_diff(df["biometric_intensity"], offsets)))
+
     # Use rolling average to smooth out noise (more stable indicator)
-    # Optimize: Use transform for better performance with large datasets
-    df["bio_growth"] = (
-        df.groupby("district")["bio_growth_raw"]
-        .transform(lambda x: x.rolling(window=ROLLING_WINDOW, min_periods=1).mean())
-    )
+    df["bio_growth"] = grouped_rolling_mean(df["bio_growth_raw"], offsets, ROLLING_WINDOW)
     df["bio_growth"] = df["bio_growth"].fillna(df["bio_growth_raw"])
-    
+
     # Clip outliers (extreme growth changes likely due to data errors or campaigns)
     df["bio_growth"] = df["bio_growth"].clip(-0.5, 0.5)
-    
+
     # Additional validation: flag extreme growth as potentially unreliable
     df["growth_reliability"] = "RELIABLE"
     extreme_growth = abs(df["bio_growth"]) > 0.3
     df.loc[extreme_growth, "growth_reliability"] = "EXTREME_GROWTH_CHECK_NEEDED"
-    
+
     # Growth direction indicator (for interpretability)
     df["growth_direction"] = "STABLE"
     df.loc[df["bio_growth"] > 0.05, "growth_direction"] = "INCREASING"
@@ -137,93 +181,89 @@ def build_features():
     # Separate positive growth (bad) from negative growth (good)
     # Only penalize for increasing dependency, not decreasing
     bio_growth_penalty = df["bio_growth"].clip(lower=0)  # Only positive growth counts as risk
-    
+
     # Calculate CIIM with optimized vectorized operations
-    df["CIIM"] = (
-        0.5 * df["biometric_intensity"]
-        + 0.3 * bio_growth_penalty
-        + 0.2 * df["exclusion_risk"]
+    ciim = (
+        CIIM_WEIGHTS["biometric_intensity"] * df["biometric_intensity"]
+        + CIIM_WEIGHTS["growth_penalty"] * bio_growth_penalty
+        + CIIM_WEIGHTS["exclusion_risk"] * df["exclusion_risk"]
     )
-    
+
     # Ensure CIIM stays in [0, 1] range (clamp for safety)
-    df["CIIM"] = df["CIIM"].clip(0, 1)
-    
+    _assign_series(df, "CIIM", ciim.clip(0, 1))
+    return df
+
+
+def _rank_indicators(df):
     # Add CIIM percentile for comparison (normalized rank)
     # Use rank() instead of qcut for better performance and handling of duplicates
     def calc_percentile(series):
         if len(series) < 2:
             return 50
         return (series.rank(pct=True) * 100).round(1)
-    
+
     df["CIIM_percentile"] = df.groupby("date")["CIIM"].transform(calc_percentile)
     df["CIIM_percentile"] = df["CIIM_percentile"].fillna(50)  # Default to median if can't calculate
-    
+
     # Round CIIM for cleaner output (4 decimal places)
-    df["CIIM"] = df["CIIM"].round(4)
+    _assign_series(df, "CIIM", df["CIIM"].round(4))
+    return df
 
+
+def _time_to_failure(df):
     # -----------------------------------
     # TIME TO FAILURE (IMPROVED - MORE STABLE) - OPTIMIZED
     # -----------------------------------
     # Only consider positive growth as accelerating risk
     # Negative growth (decreasing dependency) extends time-to-failure
     growth_factor = 1 + df["bio_growth"].clip(lower=0)  # Only positive growth accelerates
-    
+
     # Use a more stable denominator with better handling of edge cases
     # Avoid division by zero with minimum intensity threshold
     intensity_weighted = df["biometric_intensity"] * growth_factor
     min_intensity_threshold = 0.01  # Minimum intensity for meaningful calculation
-    
+
     # Use improved formula: TTF = BASE_TIME / (adjusted_intensity + epsilon)
     # Adjusted intensity accounts for both current level and growth trend
     adjusted_intensity = np.maximum(intensity_weighted, min_intensity_threshold)
     df["TTF"] = BASE_TIME / (adjusted_intensity + 1e-3)
-    
+
     # For districts with low intensity and decreasing growth, extend TTF
     # (These districts are improving and have more time)
     low_intensity_decreasing = (df["biometric_intensity"] < 0.2) & (df["bio_growth"] < -0.05)
     df.loc[low_intensity_decreasing, "TTF"] = df.loc[low_intensity_decreasing, "TTF"] * 1.5
-    
+
     # For districts with very high intensity, reduce TTF more aggressively
     high_intensity_increasing = (df["biometric_intensity"] > 0.7) & (df["bio_growth"] > 0.1)
     df.loc[high_intensity_increasing, "TTF"] = df.loc[high_intensity_increasing, "TTF"] * 0.8
-    
+
     df["TTF"] = df["TTF"].clip(lower=1, upper=MAX_TTF)
     df["TTF"] = df["TTF"].round(2)  # Round to 2 decimal places for cleaner output
+    return df
+
 
+def _acceleration_indicators(df):
     # -----------------------------------
     # CIIM ACCELERATION (EARLY WARNING) - SMOOTHED & OPTIMIZED
     # -----------------------------------
+    # Rows are still sorted by (district, date) from the growth stage
+    offsets = segment_offsets(df["district"].to_numpy())
+
     # Calculate acceleration (second derivative of CIIM)
-    df["CIIM_ACCEL"] = (
-        df.groupby("district")["CIIM"].diff().fillna(0)
-    )
-    
-    # Smooth acceleration with rolling average (optimized with transform)
-    df["CIIM_ACCEL"] = (
-        df.groupby("district")["CIIM_ACCEL"]
-        .transform(lambda x: x.rolling(window=ROLLING_WINDOW, min_periods=1).mean())
-    )
+    _assign_series(df, "CIIM_diff", np.nan_to_num(grouped_diff(df["CIIM"], offsets)))
+
+    # Smooth acceleration with rolling average
+    df["CIIM_ACCEL"] = grouped_rolling_mean(df["CIIM_diff"], offsets, ROLLING_WINDOW)
     df["CIIM_ACCEL"] = df["CIIM_ACCEL"].fillna(0)
-    
-    # Trend indicator (3-month trend) - optimized calculation
-    def calculate_trend(series):
-        if len(series) < 2:
-            return 0
-        first = series.iloc[0]
-        last = series.iloc[-1]
-        if last > first * 1.1:  # 10% increase
-            return 1
-        elif last < first * 0.9:  # 10% decrease
-            return -1
-        else:
-            return 0
-    
-    df["CIIM_trend_3mo"] = (
-        df.groupby("district")["CIIM"]
-        .transform(lambda x: x.rolling(window=3, min_periods=2).apply(calculate_trend, raw=False))
-    )
+
+    # Trend indicator (3-month trend): +1 if CIIM rose >10% over the
+    # window, -1 if it fell >10%, else 0
+    df["CIIM_trend_3mo"] = grouped_trend(df["CIIM"], offsets, window=3, min_periods=2, rise=1.1, fall=0.9)
     df["CIIM_trend_3mo"] = df["CIIM_trend_3mo"].fillna(0).astype(int)
+    return df.drop(columns=["CIIM_diff"])
+
 
+def _impact_and_policy(df):
     # -----------------------------------
     # HUMAN IMPACT
     # -----------------------------------
@@ -238,22 +278,14 @@ def build_features():
     # -----------------------------------
     # POLICY RULE ENGINE (PRIORITY-BASED)
     # -----------------------------------
-    # Initialize with NORMAL, then apply flags in priority order
-    # Priority: EMERGENCY > PROTECT_CHILDREN > AUDIT_EXPANSION > NORMAL
-    df["policy_flag"] = "NORMAL"
+    # Rule table and thresholds live in ml/policy_rules.py; the first
+    # matching rule wins: DATA_REVIEW > EMERGENCY > PROTECT_CHILDREN >
+    # AUDIT_EXPANSION > NORMAL
+    df["policy_flag"] = policy_flags(df)
+    return df
 
-    # Priority 3: Audit expansion (rapid growth needs review)
-    df.loc[df["bio_growth"] > 0.3, "policy_flag"] = "AUDIT_EXPANSION"
-    
-    # Priority 2: Protect children (child biometric ratio too high)
-    df.loc[df["child_bio_ratio"] > 0.1, "policy_flag"] = "PROTECT_CHILDREN"
-    
-    # Priority 1: Emergency (critical CIIM score)
-    df.loc[df["CIIM"] > 0.7, "policy_flag"] = "EMERGENCY"
-    
-    # Override: If data quality is poor, flag for data review
-    df.loc[df["data_quality_flag"] == "SUSPICIOUS", "policy_flag"] = "DATA_REVIEW"
 
+def _finalize(df):
     # -----------------------------------
     # FINAL CLEANUP & VALIDATION (CRITICAL)
     # -----------------------------------
@@ -269,11 +301,11 @@ def build_features():
         "CIIM_ACCEL": 0,
         "CIIM_trend_3mo": 0
     }
-    
+
     for col, default_val in critical_columns.items():
         if col in df.columns:
             df[col] = df[col].fillna(default_val)
-    
+
     # Ensure all risk metrics are in valid ranges (vectorized operations)
     df["CIIM"] = df["CIIM"].clip(0, 1)
     df["biometric_intensity"] = df["biometric_intensity"].clip(0, 1)
@@ -284,20 +316,116 @@ def build_features():
 
     # Normalize district names (optimized)
     df["district"] = df["district"].str.upper().str.strip()
-    
+
     # Final data quality check
     invalid_rows = df[df["CIIM"].isna() | df["TTF"].isna() | df["biometric_intensity"].isna()]
     if len(invalid_rows) > 0:
         print(f"  ⚠️  WARNING: {len(invalid_rows)} rows still have missing critical values after cleanup")
         # Drop rows with critical missing values as last resort
         df = df.dropna(subset=["CIIM", "TTF", "biometric_intensity"])
-    
-    # -----------------------------------
-    # SAVE OUTPUT (OPTIMIZED)
-    # -----------------------------------
-    output_path = "data/processed/merged_aadhaar.csv"
-    df.to_csv(output_path, index=False)
-    
+    return df
+
+
+def _seed_tail(df, tail):
+    # Stored values the stages would otherwise compute ride along as
+    # _tail_<col>, so every real column is created in the same place as in a
+    # build without a tail and partitions keep one column layout
+    tail = tail[TAIL_COLUMNS].assign(district=tail["district"].astype(str).str.title())
+    tail = tail.rename(columns={c: f"_tail_{c}" for c in TAIL_COLUMNS if c not in df.columns})
+    seeded = pd.concat([tail.assign(_tail=True), df.assign(_tail=False)], ignore_index=True)
+    return seeded[list(df.columns) + [c for c in seeded.columns if c not in df.columns]]
+
+
+# -----------------------------------
+# PARALLEL PER-DISTRICT STAGES
+# -----------------------------------
+# Columns each per-district stage reads; only these are shipped to workers
+STAGE_INPUTS = {
+    "growth": [
+        "district", "date", "biometric_intensity", "child_bio_ratio",
+        "_tail", "_tail_bio_growth_raw", "_tail_CIIM",
+    ],
+    "acceleration": ["district", "date", "CIIM", "_tail", "_tail_CIIM_diff"],
+}
+
+
+def _district_shards(df, workers):
+    # Growth and acceleration work on district segments (by name alone), so
+    # every row of a district must land in the same shard
+    shard = pd.util.hash_pandas_object(df["district"], index=False).to_numpy() % workers
+    return [df[shard == i] for i in range(workers) if (shard == i).any()]
+
+
+def _per_district(fn, inputs, df, pool, workers):
+    """
+    Run a per-district stage over hashed-district shards in `pool`.
+
+    Workers get only the stage's input columns; their results are aligned
+    back to the full rows by position, so the output matches fn(df) exactly.
+    """
+    if pool is None:
+        return fn(df)
+    inputs = [c for c in STAGE_INPUTS[inputs] if c in df.columns]
+    shipped = df[inputs].assign(_row=np.arange(len(df)))
+    parts = list(pool.map(fn, _district_shards(shipped, workers)))
+    # Each (district, date) group comes from one shard in its original order,
+    # so a stable sort restores exactly the serial row order
+    out = pd.concat(parts).sort_values(["district", "date"], kind="stable")
+
+    df = df.iloc[out.pop("_row").to_numpy()]
+    for col in out.columns:
+        df[col] = out[col]
+    return df.drop(columns=[c for c in inputs if c not in out.columns])
+
+
+def compute_features(bio, enr, demo, tail=None, profiler=None, workers=1):
+    """
+    Run the feature pipeline on raw frames.
+
+    `tail` holds the processed rows per district from an earlier run (see
+    ml.incremental.tail_state); it seeds the per-district rolling windows
+    and is dropped from the result. Each step is recorded as
+    a stage of `profiler` (an ml.profiling.StageProfiler).
+
+    With workers > 1 the per-district stages (growth, acceleration and
+    trend) run on hashed-district shards in a process pool; date-wide steps
+    such as CIIM_percentile still see the whole table.
+    """
+    stage = (profiler or StageProfiler()).run
+
+    bio, enr, demo = stage("standardize", _standardize, bio, enr, demo)
+    df = stage("merge", _merge, bio, enr, demo)
+    df = stage("base_indicators", _base_indicators, df)
+
+    if tail is not None and len(tail):
+        dtypes = df.dtypes
+        df = stage("seed_tail", _seed_tail, df, tail)
+
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as pool:
+        df = stage("growth", _per_district, _growth_indicators, "growth", df, pool, workers)
+        df = stage("percentile_rank", _rank_indicators, df)
+        df = stage("ttf", _time_to_failure, df)
+        df = stage(
+            "acceleration_trend", _per_district, _acceleration_indicators, "acceleration", df, pool, workers
+        )
+
+    if "_tail" in df.columns:
+        df = df[~df["_tail"]].drop(columns=[c for c in df.columns if c.startswith("_tail")]).astype(dtypes)
+
+    df = stage("impact_policy", _impact_and_policy, df)
+    return stage("finalize", _finalize, df)
+
+
+def _write_outputs(df, manifest, store_path, mode, stage, dates=None):
+    # District/state rollups and map LOD cells are written alongside the
+    # pincode table; readers see none of them until the manifest is published
+    rollups = stage("rollups", build_rollups, df)
+    for level, rollup in rollups.items():
+        stage(f"write_{level}", write_partitions, rollup, manifest, store_path, table=level, mode=mode, dates=dates)
+    return stage("write_risk", write_partitions, df, manifest, store_path, mode=mode, dates=dates)
+
+
+def _print_summary(df, store_path, manifest, csv_path):
     # Summary statistics
     print(f"\n✅ CIIM Aadhaar Risk Table created successfully!")
     print(f"   📊 Total records: {len(df):,}")
@@ -307,8 +435,256 @@ def build_features():
         print(f"   🏛️  Unique states: {df['state'].nunique():,}")
     print(f"   📈 Average CIIM: {df['CIIM'].mean():.3f}")
     print(f"   ⏳ Average TTF: {df['TTF'].mean():.1f} months")
-    print(f"   📁 Saved to: {output_path}")
+    print(f"   📁 Saved to: {store_path} ({len(manifest['tables']['risk']['partitions'])} date partitions)")
+    if csv_path:
+        print(f"   📁 CSV export: {csv_path}")
+
+
+def build_features(store_path=STORE_PATH, csv_path=None, incremental=False, profile_stage=None, workers=1,
+                   out_of_core=False, batch_freq=BATCH_FREQ):
+    """
+    Build the risk store from all raw shards (or only new ones if `incremental`).
+
+    A per-stage run report is written to <store_path>/build_report.json;
+    `profile_stage` names one stage to run under cProfile as well, and
+    `workers` > 1 runs the per-district stages in that many processes.
+    `out_of_core` rebuilds in `batch_freq` date batches with bounded memory.
+    """
+    profiler = StageProfiler(profile_stage, profile_dir=store_path)
+    if incremental:
+        return build_features_incremental(store_path, csv_path, profiler, workers)
+    if out_of_core:
+        return build_features_out_of_core(store_path, csv_path, batch_freq, profiler, workers)
+
+    print("Loading Aadhaar datasets...")
+    stage = profiler.run
+
+    # Snapshot shard metadata before reading so later drops are seen as new
+    sources = scan_sources()
+
+    # Each shard's date range is recorded so incremental runs can skip it
+    ranges = {}
+    bio = stage("load_biometric", load_folder, "api_data_aadhar_biometric", date_ranges=ranges)
+    enr = stage("load_enrolment", load_folder, "api_data_aadhar_enrolment", date_ranges=ranges)
+    demo = stage("load_demographic", load_folder, "api_data_aadhar_demographic", date_ranges=ranges)
+
+    df = compute_features(bio, enr, demo, profiler=profiler, workers=workers)
+    df = stage("coordinates", attach_coordinates, df, load_coordinates())
+
+    # -----------------------------------
+    # SAVE OUTPUT (COLUMNAR STORE, DATE-PARTITIONED)
+    # -----------------------------------
+    manifest = _write_outputs(df, open_manifest(store_path, keep_tables=False), store_path, "overwrite", stage)
+    # One version per build: every table switches over together
+    stage("publish", publish_manifest, manifest, store_path, {"sources": with_date_ranges(sources, ranges)})
+    stage("tail_state", lambda: save_tail_state(tail_state(df), store_path))
+
+    # Optional flat CSV export for ad-hoc use
+    if csv_path:
+        stage("csv_export", df.to_csv, csv_path, index=False)
+
+    _print_summary(df, store_path, manifest, csv_path)
+    profiler.write(store_path, mode="full", rows=len(df), workers=workers)
+
+
+def build_features_incremental(store_path=STORE_PATH, csv_path=None, profiler=None, workers=1):
+    """
+    Process only raw shards that arrived since the last build.
+
+    Every date touched by a new shard, and every later stored date, is
+    recomputed from raw rows (so CIIM_percentile sees the full population of
+    each date) and upserted into the store; earlier dates are left alone.
+    Unchanged shards are only parsed when the date range recorded for them
+    in the manifest sources overlaps the affected dates.
+    """
+    try:
+        manifest = read_manifest(store_path)
+    except FileNotFoundError:
+        print("No existing risk store - running a full build")
+        return build_features(store_path, csv_path, profile_stage=profiler and profiler.profile_stage, workers=workers)
+
+    profiler = profiler or StageProfiler(profile_dir=store_path)
+    stage = profiler.run
+    sources = scan_sources()
+    previous = manifest.get("sources")
+    new_shards, removed_shards = changed_sources(previous, sources)
+
+    if removed_shards or previous is None:
+        print("Raw shards were removed or never tracked - running a full build")
+        return build_features(store_path, csv_path, profile_stage=profiler.profile_stage, workers=workers)
+    if not new_shards:
+        print("✅ Risk store is up to date - no new raw shards")
+        return
+
+    print(f"Found {len(new_shards)} new raw shard(s)")
+
+    # New shards are parsed once; every dated row of theirs is on a touched date
+    ranges, fresh, touched = {}, {folder: [] for folder in SCHEMAS}, set()
+    for folder, path in new_shards:
+        rows = stage("read_new_shards", read_shard, path, folder).dropna(subset=["date"])
+        key = shard_key(path, folder)
+        ranges[key] = date_range(rows)
+        fresh[folder].append(rows)
+        touched.update(rows["date"].dt.strftime("%Y-%m-%d").unique())
+        # A rewritten shard may have dropped rows from dates it used to cover
+        if previous.get(key, {}).get("min_date"):
+            touched.add(previous[key]["min_date"])
+    if not touched:
+        print("✅ New shards contain no dated rows")
+        update_manifest(store_path, {"sources": with_date_ranges(sources, previous, ranges)})
+        return
+
+    # Downstream dates depend on the touched ones through the rolling windows
+    first_touched = min(touched)
+    stored_dates = list_dates(store_path)
+    affected = sorted(touched | {d for d in stored_dates if d >= first_touched})
+    affected_ts = pd.to_datetime(affected)
+
+    # Seed the rolling windows with every stored row before the first touched date
+    tail = load_tail_state(store_path)
+    if tail is None or tail["date"].max() >= pd.Timestamp(first_touched):
+        history = read_store(
+            store_path,
+            dates=[d for d in stored_dates if d < first_touched],
+            columns=TAIL_COLUMNS
+        )
+        history = history.sort_values("district", kind="stable")
+        tail = tail_state(history)
+
+    # Unchanged shards are only parsed if their recorded date range reaches
+    # the affected dates
+    new_keys = {shard_key(path, folder) for folder, path in new_shards}
+    overlapping = {
+        folder: [
+            os.path.join(BASE_PATH, key) for key, meta in previous.items()
+            if key.split("/", 1)[0] == folder and key not in new_keys and may_hold_dates(meta, first_touched)
+        ]
+        for folder in SCHEMAS
+    }
+    print(
+        f"Loading raw rows for {len(affected)} affected date(s) from "
+        f"{sum(map(len, overlapping.values()))} unchanged shard(s)..."
+    )
+
+    def load_affected(folder):
+        frames = fresh.pop(folder)
+        if overlapping[folder]:
+            frames.append(load_folder(folder, dates=affected_ts, shards=overlapping[folder], date_ranges=ranges))
+        return concat_frames(frames) if frames else empty_feed(folder)
+
+    bio = stage("load_biometric", load_affected, "api_data_aadhar_biometric")
+    enr = stage("load_enrolment", load_affected, "api_data_aadhar_enrolment")
+    demo = stage("load_demographic", load_affected, "api_data_aadhar_demographic")
+
+    df = compute_features(bio, enr, demo, tail=tail, profiler=profiler, workers=workers)
+    df = stage("coordinates", attach_coordinates, df, load_coordinates())
+
+    # An affected date that no longer produces rows loses its partition
+    manifest = _write_outputs(df, open_manifest(store_path), store_path, "upsert", stage, dates=affected)
+    stage("publish", publish_manifest, manifest, store_path, {"sources": with_date_ranges(sources, previous, ranges)})
+    stage(
+        "tail_state",
+        lambda: save_tail_state(tail_state(pd.concat([tail, df], ignore_index=True)), store_path)
+    )
+
+    if csv_path:
+        stage("csv_export", lambda: read_store(store_path).to_csv(csv_path, index=False))
+
+    _print_summary(df, store_path, manifest, csv_path)
+    profiler.write(store_path, mode="incremental", rows=len(df), dates=len(affected), workers=workers)
+
+
+def build_features_out_of_core(store_path=STORE_PATH, csv_path=None, batch_freq=BATCH_FREQ, profiler=None,
+                               workers=1, spill_dir=None):
+    """
+    Full rebuild for histories larger than memory.
+
+    The raw feeds are first spilled to local disk by date batch (see
+    ml.out_of_core), then each batch is computed and its partition files
+    written on their own; the manifest switches to the new dataset once,
+    after the last batch. The rolling windows continue across batches through
+    the same tail state the incremental build uses, so the result matches
+    an in-memory build. That state keeps a few narrow columns of every row
+    built so far, so it grows with the history while the raw feeds do not.
+    """
+    profiler = profiler or StageProfiler(profile_dir=store_path)
+    stage = profiler.run
+
+    # Snapshot shard metadata before reading so later drops are seen as new
+    sources = scan_sources()
+
+    print(f"Spilling raw shards to disk by date batch ({batch_freq})...")
+    spill = stage("spill", spill_feeds, spill_dir, batch_freq)
+    try:
+        batches = spill.batches
+        geo = load_coordinates()
+        # Batches are staged into one manifest that is only published after
+        # the last batch; until then readers keep the previous dataset
+        manifest = open_manifest(store_path, keep_tables=False)
+        tail, rows = None, 0
+
+        for i, batch in enumerate(batches):
+            print(f"\n📦 Batch {batch} ({i + 1}/{len(batches)})")
+            bio = stage("load_biometric", spill.read, "api_data_aadhar_biometric", batch)
+            enr = stage("load_enrolment", spill.read, "api_data_aadhar_enrolment", batch)
+            demo = stage("load_demographic", spill.read, "api_data_aadhar_demographic", batch)
+
+            df = compute_features(bio, enr, demo, tail=tail, profiler=profiler, workers=workers)
+            del bio, enr, demo
+            df = stage("coordinates", attach_coordinates, df, geo)
+
+            # Batches never share a date, so each one adds its own partitions
+            _write_outputs(df, manifest, store_path, "upsert", stage)
+            tail = stage(
+                "tail_state", tail_state,
+                df if tail is None else pd.concat([tail, df], ignore_index=True)
+            )
+            if csv_path:
+                stage("csv_export", df.to_csv, csv_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(df)
+    finally:
+        cleanup(spill)
+
+    if not batches:
+        print("⚠️  Raw shards contain no dated rows - nothing written")
+        return
+
+    sources = with_date_ranges(sources, spill.date_ranges)
+    stage("publish", publish_manifest, manifest, store_path, {"sources": sources})
+    save_tail_state(tail, store_path)
+
+    # The full table is never loaded, so the summary comes from the manifest
+    partitions = list(manifest["tables"]["risk"]["partitions"])
+    print(f"\n✅ CIIM Aadhaar Risk Table rebuilt in {len(batches)} batches!")
+    print(f"   📊 Total records: {rows:,}")
+    print(f"   📅 Date range: {partitions[0]} to {partitions[-1]}")
+    print(f"   📁 Saved to: {store_path} ({len(partitions)} date partitions)")
+    if csv_path:
+        print(f"   📁 CSV export: {csv_path}")
+    profiler.write(store_path, mode="out_of_core", rows=rows, batches=len(batches), workers=workers)
 
 
 if __name__ == "__main__":
-    build_features()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the CIIM Aadhaar risk table")
+    parser.add_argument("--store", default=STORE_PATH, help="columnar output directory")
+    parser.add_argument("--csv", nargs="?", const=CSV_OUTPUT_PATH, default=None,
+                        help="also export a flat CSV (default path: %(const)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process raw shards added since the last build")
+    parser.add_argument("--profile-stage", default=None, metavar="STAGE",
+                        help="run one build stage (e.g. growth, percentile_rank) under cProfile")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="full rebuild in date batches spilled to local disk (bounded memory)")
+    parser.add_argument("--batch-freq", default=BATCH_FREQ,
+                        help="date batch size for --out-of-core, as a pandas period alias (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for the per-district stages (sharded by hashed district)")
+    args = parser.parse_args()
+
+    build_features(
+        store_path=args.store, csv_path=args.csv, incremental=args.incremental,
+        profile_stage=args.profile_stage, workers=args.workers,
+        out_of_core=args.out_of_core, batch_freq=args.batch_freq
+    )
@@ -0,0 +1,70 @@
+"""
+District coordinates for the feature build.
+
+data/geo/district_lat_lon.csv (written by ml/geo_builder.py) uses India
+Post spellings ("24 PARAGANAS NORTH", "GURUGRAM"), while the feeds use
+their own ("North 24 Parganas", "Gurgaon"). Both sides are matched on the
+normalized, alias-resolved keys from backend/data_access/names.py. When
+the geo file carries a state column, (state, district) is matched first so
+same-named districts in different states get their own coordinates.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.data_access.names import district_key, state_key
+
+GEO_PATH = "data/geo/district_lat_lon.csv"
+GEO_COLUMNS = ["lat", "lon"]
+
+
+def load_coordinates(path=GEO_PATH):
+    """District coordinates keyed for matching, or None if the file is missing."""
+    if not os.path.exists(path):
+        print(f"⚠️  {path} not found - building without coordinates")
+        return None
+    geo = pd.read_csv(path).dropna(subset=["district"] + GEO_COLUMNS)
+    geo["_district"] = geo["district"].map(district_key)
+    if "state" in geo.columns:
+        geo["_state"] = geo["state"].map(state_key)
+    return geo
+
+
+def _lookup(geo):
+    by_district = geo.groupby("_district")[GEO_COLUMNS].mean()
+    by_pair = geo.groupby(["_state", "_district"])[GEO_COLUMNS].mean() if "_state" in geo.columns else None
+
+    def coordinates(state, district):
+        key = district_key(district)
+        if by_pair is not None and (state_key(state), key) in by_pair.index:
+            return tuple(by_pair.loc[(state_key(state), key)])
+        if key in by_district.index:
+            return tuple(by_district.loc[key])
+        return (np.nan, np.nan)
+
+    return coordinates
+
+
+def attach_coordinates(df, geo):
+    """
+    Add lat/lon columns to a frame with state and district columns.
+
+    Matching runs once per distinct (state, district) pair, not per row.
+    Unmatched districts get NaN coordinates.
+    """
+    df = df.copy()
+    if geo is None:
+        df["lat"] = np.nan
+        df["lon"] = np.nan
+        return df
+
+    codes, pairs = pd.MultiIndex.from_frame(df[["state", "district"]].astype(str)).factorize()
+    coordinates = _lookup(geo)
+    points = np.array([coordinates(state, district) for state, district in pairs], dtype=np.float64).reshape(-1, 2)
+    df["lat"] = points[codes, 0]
+    df["lon"] = points[codes, 1]
+
+    matched = np.isfinite(points[:, 0])
+    print(f"   🗺️  Coordinates matched for {matched.sum():,}/{len(pairs):,} districts")
+    return df
@@ -1,32 +1,192 @@
+"""
+District coordinates from the India Post PIN directory.
+
+The directory is streamed in chunks: each chunk is reduced to per-district
+coordinate sums and post-office counts, which are added into running
+totals, so memory is bounded by one chunk plus one row per district.
+With workers > 1 the file is split into byte ranges at line boundaries and
+each range is reduced in its own process.
+
+The result is written atomically, next to a stamp of the source file; a
+re-run with an unchanged source skips the work.
+
+    python -m ml.geo_builder [--raw PATH] [--out PATH] [--workers N] [--force]
+"""
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-print("Loading India Post geo data...")
+from ml.geo import GEO_PATH
+
+RAW_PATH = "data/geo/india_post_raw.csv"
+CHUNK_ROWS = 250_000
+
+# India bounding box; post offices outside it have bad coordinates
+LAT_RANGE = (6, 36)
+LON_RANGE = (68, 98)
+
+# Normalized source column -> output column
+SOURCE_COLUMNS = {"statename": "state", "district": "district", "latitude": "lat", "longitude": "lon"}
+
+
+def _stamp_path(out_path):
+    return f"{out_path}.source.json"
+
+
+def _source_stamp(raw_path):
+    st = os.stat(raw_path)
+    return {"source": os.path.abspath(raw_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _is_current(raw_path, out_path):
+    try:
+        with open(_stamp_path(out_path)) as f:
+            return os.path.exists(out_path) and json.load(f) == _source_stamp(raw_path)
+    except (FileNotFoundError, ValueError):
+        return False
+
+
+def _header(raw_path):
+    """{source column name as written: output column} for the columns we use."""
+    columns = pd.read_csv(raw_path, nrows=0).columns
+    return {c: SOURCE_COLUMNS[c.strip().lower()] for c in columns if c.strip().lower() in SOURCE_COLUMNS}
+
+
+def _keys(header):
+    return ["state", "district"] if "state" in header.values() else ["district"]
+
+
+def _chunk_sums(chunk, keys):
+    """Per-district lat/lon sums and counts for one chunk of post offices."""
+    chunk["district"] = chunk["district"].astype(str).str.strip().str.upper()
+    if "state" in keys:
+        chunk["state"] = chunk["state"].astype(str).str.strip().str.upper()
+    chunk["lat"] = pd.to_numeric(chunk["lat"], errors="coerce")
+    chunk["lon"] = pd.to_numeric(chunk["lon"], errors="coerce")
+
+    chunk = chunk[chunk["lat"].between(*LAT_RANGE) & chunk["lon"].between(*LON_RANGE)]
+    sums = chunk.groupby(keys)[["lat", "lon"]].sum()
+    sums["count"] = chunk.groupby(keys).size()
+    return sums
+
+
+def _add(parts):
+    """Sum per-district partial sums (aligned on the district index)."""
+    totals = None
+    for part in parts:
+        totals = part if totals is None else totals.add(part, fill_value=0)
+    return totals
+
+
+def _accumulate(chunks, keys):
+    return _add(_chunk_sums(chunk, keys) for chunk in chunks)
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file."""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._remaining)
+        data = self._file.read(n)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _range_sums(raw_path, start, end, names, header, chunksize):
+    with io.BufferedReader(_ByteRange(raw_path, start, end)) as stream:
+        chunks = pd.read_csv(
+            stream, header=None, names=names, usecols=list(header),
+            dtype=str, chunksize=chunksize
+        )
+        return _accumulate((c.rename(columns=header) for c in chunks), _keys(header))
+
+
+def _split(raw_path, workers):
+    """Byte ranges covering the data rows, each starting at a line boundary."""
+    size = os.path.getsize(raw_path)
+    with open(raw_path, "rb") as f:
+        f.readline()  # header
+        bounds = [f.tell()]
+        for i in range(1, workers):
+            f.seek(max(bounds[-1], size * i // workers))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def build_geo(raw_path=RAW_PATH, out_path=GEO_PATH, chunksize=CHUNK_ROWS, workers=1, force=False):
+    """
+    Average post-office coordinates per district and write them to `out_path`.
+
+    Returns the number of districts written, or None when the output is
+    already up to date with `raw_path`. Parallel mode assumes no quoted
+    field spans lines (true of the India Post export).
+    """
+    if not force and _is_current(raw_path, out_path):
+        print(f"✅ {out_path} is up to date with {raw_path}")
+        return None
 
-raw = pd.read_csv("data/geo/india_post_raw.csv")
-raw.columns = raw.columns.str.strip().str.lower()
+    header = _header(raw_path)
+    keys = _keys(header)
+    print(f"Streaming {raw_path} in chunks of {chunksize:,} rows...")
 
-geo = raw[["district", "latitude", "longitude"]]
-geo.columns = ["district", "lat", "lon"]
+    if workers > 1:
+        names = list(pd.read_csv(raw_path, nrows=0).columns)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = [
+                pool.submit(_range_sums, raw_path, start, end, names, header, chunksize)
+                for start, end in _split(raw_path, workers)
+            ]
+            totals = _add(p.result() for p in parts)
+    else:
+        chunks = pd.read_csv(raw_path, usecols=list(header), dtype=str, chunksize=chunksize)
+        totals = _accumulate((c.rename(columns=header) for c in chunks), keys)
 
-# Normalize district names
-geo["district"] = geo["district"].astype(str).str.strip().str.upper()
+    columns = ["district"] + [k for k in keys if k != "district"] + ["lat", "lon"]
+    if totals is None:
+        geo = pd.DataFrame(columns=columns)
+    else:
+        geo = pd.DataFrame({
+            "lat": totals["lat"] / totals["count"],
+            "lon": totals["lon"] / totals["count"],
+        }).reset_index()[columns]
 
-# Convert to numeric
-geo["lat"] = pd.to_numeric(geo["lat"], errors="coerce")
-geo["lon"] = pd.to_numeric(geo["lon"], errors="coerce")
+    tmp_path = f"{out_path}.tmp"
+    geo.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    with open(_stamp_path(out_path), "w") as f:
+        json.dump(_source_stamp(raw_path), f)
 
-# HARD FILTER to India bounding box
-geo = geo[
-    (geo["lat"] >= 6) & (geo["lat"] <= 36) &
-    (geo["lon"] >= 68) & (geo["lon"] <= 98)
-]
+    print("Geo file saved with", len(geo), "districts.")
+    return len(geo)
 
-# Drop invalid
-geo = geo.dropna(subset=["lat","lon","district"])
 
-# Average PIN codes to district
-geo = geo.groupby("district")[["lat","lon"]].mean().reset_index()
+if __name__ == "__main__":
+    import argparse
 
-geo.to_csv("data/geo/district_lat_lon.csv", index=False)
+    parser = argparse.ArgumentParser(description="Build district coordinates from the India Post PIN directory")
+    parser.add_argument("--raw", default=RAW_PATH)
+    parser.add_argument("--out", default=GEO_PATH)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="processes, each reducing one byte range")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the source is unchanged")
+    args = parser.parse_args()
 
-print("Geo file saved with", len(geo), "districts.")
+    build_geo(args.raw, args.out, args.chunksize, args.workers, args.force)
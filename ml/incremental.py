@@ -0,0 +1,113 @@
+import os
+
+import pandas as pd
+
+from backend.data_access.loader import BASE_PATH, SCHEMAS, list_shards, shard_key
+from backend.data_access.store import STORE_PATH
+
+# tail_state.parquet from older builds held only the last rolling window
+TAIL_STATE_FILE = "tail_series.parquet"
+
+# A shard is unchanged while these match; its date range rides along so an
+# incremental build only re-reads shards that overlap the affected dates
+SHARD_IDENTITY = ["size", "mtime_ns"]
+SHARD_RANGE = ["min_date", "max_date"]
+
+# Columns needed to continue the per-district rolling windows
+TAIL_COLUMNS = ["district", "date", "biometric_intensity", "bio_growth_raw", "CIIM", "CIIM_diff"]
+
+
+# -----------------------------------
+# RAW SHARD TRACKING
+# -----------------------------------
+def scan_sources(folders=SCHEMAS):
+    """Size and mtime of every raw shard, keyed by "<folder>/<file>"."""
+    sources = {}
+    for folder in folders:
+        if not os.path.isdir(os.path.join(BASE_PATH, folder)):
+            continue
+        for path in list_shards(folder):
+            st = os.stat(path)
+            sources[shard_key(path, folder)] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+    return sources
+
+
+def _identity(meta):
+    return {k: meta.get(k) for k in SHARD_IDENTITY}
+
+
+def changed_sources(previous, current):
+    """
+    Compare two scan_sources() results (recorded date ranges are ignored).
+
+    Returns ([(folder, path), ...] for new or rewritten shards, [removed keys]).
+    """
+    previous = previous or {}
+    new = [
+        (key.split("/", 1)[0], os.path.join(BASE_PATH, key))
+        for key, meta in current.items()
+        if key not in previous or _identity(previous[key]) != _identity(meta)
+    ]
+    removed = [key for key in previous if key not in current]
+    return new, removed
+
+
+def with_date_ranges(sources, *date_ranges):
+    """
+    `sources` with each shard's recorded date range (later `date_ranges`
+    dicts win). Shards are only listed if they are in `sources`.
+    """
+    sources = {key: dict(meta) for key, meta in sources.items()}
+    for ranges in date_ranges:
+        for key, meta in (ranges or {}).items():
+            if key in sources:
+                sources[key].update({k: meta.get(k) for k in SHARD_RANGE})
+    return sources
+
+
+def may_hold_dates(meta, first_date):
+    """Whether a tracked shard can hold rows on or after `first_date` ("YYYY-MM-DD")."""
+    if "max_date" not in meta:
+        # Tracked before date ranges were recorded
+        return True
+    return meta["max_date"] is not None and meta["max_date"] >= first_date
+
+
+# -----------------------------------
+# PER-DISTRICT TAIL STATE
+# -----------------------------------
+def tail_state(df):
+    """
+    Every processed row per district, with the CIIM step (CIIM_diff) that
+    feeds the CIIM_ACCEL rolling mean.
+
+    The rolling means keep a running sum from a district's first row (see
+    ml.ts_kernels.grouped_rolling_mean), so a build continued from anything
+    shorter than the whole series would differ from a full build in the last
+    bits. `df` must be in date order within each district; rows that
+    already carry a CIIM_diff (an older tail) keep it.
+    """
+    cols = [c for c in TAIL_COLUMNS if c in df.columns]
+    tail = df[cols].sort_values("district", kind="stable").reset_index(drop=True)
+
+    diff = tail.groupby("district", observed=True, sort=False)["CIIM"].diff().fillna(0)
+    tail["CIIM_diff"] = tail["CIIM_diff"].fillna(diff) if "CIIM_diff" in tail.columns else diff
+
+    tail["district"] = tail["district"].astype(str)
+    return tail[TAIL_COLUMNS]
+
+
+def save_tail_state(tail, path=STORE_PATH):
+    target = os.path.join(path, TAIL_STATE_FILE)
+    tail.to_parquet(target + ".tmp", index=False)
+    os.replace(target + ".tmp", target)
+
+
+def load_tail_state(path=STORE_PATH):
+    target = os.path.join(path, TAIL_STATE_FILE)
+    if not os.path.exists(target):
+        return None
+    return pd.read_parquet(target)
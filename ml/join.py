@@ -0,0 +1,91 @@
+"""
+Join stage of the feature pipeline.
+
+The three raw feeds are joined on (date, district, pincode). Instead of
+hashing the string/datetime key columns row by row, the keys are packed
+into one int64 per row:
+
+    key = day_number << 40 | district_code << 20 | pincode
+
+where district_code indexes a dictionary shared by all feeds and
+day_number counts days since the earliest date. Each feed is projected to
+the columns the pipeline uses before the join, so the demographic feed only
+contributes its keys (it filters rows, nothing else).
+"""
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["date", "district", "pincode"]
+
+# Columns each feed contributes beyond the keys
+BIO_COLUMNS = ["state", "bio_age_5_17", "bio_age_17_"]
+ENR_COLUMNS = ["age_0_5", "age_5_17", "age_18_greater"]
+
+OUTPUT_COLUMNS = ["date", "state", "district", "pincode"] + BIO_COLUMNS[1:] + ENR_COLUMNS
+
+_PINCODE_BITS = 20
+_DISTRICT_BITS = 20
+
+
+def _normalized_district(df):
+    """District as a categorical of stripped, title-cased names (normalized per category, not per row)."""
+    district = df["district"]
+    if not isinstance(district.dtype, pd.CategoricalDtype):
+        district = district.astype("category")
+    names = pd.Series(district.cat.categories).astype(str).str.strip().str.title()
+    return district, names
+
+
+def encode_districts(frames):
+    """
+    Re-code the district column of every frame against one shared, sorted
+    dictionary of normalized names. Returns the dictionary.
+    """
+    normalized = [_normalized_district(df) for df in frames]
+    dictionary = pd.Index(sorted(set().union(*(set(names) for _, names in normalized))))
+
+    for df, (district, names) in zip(frames, normalized):
+        mapping = dictionary.get_indexer(names)
+        codes = district.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, mapping[codes], -1)
+        df["district"] = pd.Categorical.from_codes(codes, dictionary)
+    return dictionary
+
+
+def pack_keys(df, first_day):
+    """Pack (date, district code, pincode) into one int64 per row."""
+    day = df["date"].to_numpy().astype("datetime64[D]").astype(np.int64) - first_day
+    # +1 so a missing district (code -1) still joins with other missing districts, as merge does
+    district = df["district"].cat.codes.to_numpy().astype(np.int64) + 1
+    pincode = df["pincode"].to_numpy().astype(np.int64)
+
+    if len(pincode) and (pincode.min() < 0 or pincode.max() >= 1 << _PINCODE_BITS):
+        raise ValueError("pincode outside the packable range [0, 2**20)")
+    return (day << (_DISTRICT_BITS + _PINCODE_BITS)) | (district << _PINCODE_BITS) | pincode
+
+
+def join_feeds(bio, enr, demo):
+    """
+    Inner-join the biometric, enrolment and demographic feeds on
+    (date, district, pincode).
+
+    Dates must already be parsed with unparseable rows dropped. The result
+    has the biometric keys and state, the biometric and enrolment counts,
+    and the same rows (in the same order) as the equivalent pair of
+    DataFrame.merge calls on the three key columns.
+    """
+    bio = bio[KEY_COLUMNS + BIO_COLUMNS].copy()
+    enr = enr[KEY_COLUMNS + ENR_COLUMNS].copy()
+    demo = demo[KEY_COLUMNS].copy()
+
+    frames = [bio, enr, demo]
+    encode_districts(frames)
+
+    dates = [f["date"].min() for f in frames if len(f)]
+    first_day = np.datetime64(min(dates), "D").astype(np.int64) if dates else 0
+    for f in frames:
+        f["_key"] = pack_keys(f, first_day)
+
+    df = bio.merge(enr.drop(columns=KEY_COLUMNS), on="_key", how="inner")
+    df = df.merge(demo[["_key"]], on="_key", how="inner")
+    return df[OUTPUT_COLUMNS]
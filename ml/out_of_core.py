@@ -0,0 +1,98 @@
+"""
+Date-batched spill of the raw feeds for the out-of-core build.
+
+One streaming pass reads every raw shard in chunks and writes each chunk's
+rows to local Parquet files grouped by date batch (a calendar period such
+as a month). The build then loads one batch of all three feeds at a time,
+so peak memory follows the largest batch instead of the whole history.
+Batches never split a date, so date-wide steps (CIIM_percentile) still see
+every district of a date.
+"""
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from backend.data_access.loader import (
+    SCHEMAS,
+    concat_frames,
+    date_range,
+    empty_feed,
+    iter_folder,
+    list_shards,
+    shard_key
+)
+
+BATCH_FREQ = "M"            # pandas period alias: one batch per calendar month
+SPILL_CHUNK_ROWS = 500_000  # raw rows parsed per chunk while spilling
+
+
+class Spill:
+    """Raw rows of every feed on local disk, partitioned by date batch."""
+
+    def __init__(self, root, freq=BATCH_FREQ):
+        self.root = root
+        self.freq = freq
+        self._parts = 0
+        # Date range of every spilled shard, keyed like the manifest sources
+        self.date_ranges = {}
+
+    def _batch_dir(self, folder, batch):
+        return os.path.join(self.root, folder, f"batch={batch}")
+
+    def add(self, folder, chunk):
+        chunk = chunk.dropna(subset=["date"])
+        keys = chunk["date"].dt.to_period(self.freq).astype(str)
+        for batch, rows in chunk.groupby(keys, sort=False):
+            target = self._batch_dir(folder, batch)
+            os.makedirs(target, exist_ok=True)
+            self._parts += 1
+            rows.to_parquet(os.path.join(target, f"part-{self._parts:06d}.parquet"), index=False)
+
+    @property
+    def batches(self):
+        """Batch keys present in any feed, oldest first."""
+        keys = set()
+        for folder in os.listdir(self.root):
+            keys.update(d.split("=", 1)[1] for d in os.listdir(os.path.join(self.root, folder)))
+        return sorted(keys, key=lambda key: pd.Period(key, freq=self.freq))
+
+    def read(self, folder, batch):
+        """All spilled rows of one feed and batch (empty frame if none)."""
+        target = self._batch_dir(folder, batch)
+        if not os.path.isdir(target):
+            return empty_feed(folder)
+        return concat_frames([pd.read_parquet(os.path.join(target, f)) for f in sorted(os.listdir(target))])
+
+
+def spill_feeds(spill_dir=None, freq=BATCH_FREQ, chunksize=SPILL_CHUNK_ROWS, folders=SCHEMAS):
+    """
+    Stream every raw shard of `folders` into a Spill under `spill_dir`
+    (a fresh temporary directory if None). Remove it with cleanup().
+    """
+    root = tempfile.mkdtemp(prefix="ciim_spill_", dir=spill_dir)
+    spill = Spill(root, freq)
+    try:
+        for folder in folders:
+            for path in list_shards(folder):
+                ranges = []
+                for chunk in iter_folder(folder, chunksize=chunksize, shards=[path]):
+                    ranges.append(date_range(chunk))
+                    spill.add(folder, chunk)
+                spill.date_ranges[shard_key(path, folder)] = _merge_ranges(ranges)
+    except BaseException:
+        cleanup(spill)
+        raise
+    return spill
+
+
+def _merge_ranges(ranges):
+    dated = [r for r in ranges if r["min_date"] is not None]
+    if not dated:
+        return {"min_date": None, "max_date": None}
+    return {"min_date": min(r["min_date"] for r in dated), "max_date": max(r["max_date"] for r in dated)}
+
+
+def cleanup(spill):
+    shutil.rmtree(spill.root, ignore_errors=True)
@@ -0,0 +1,132 @@
+"""
+Declarative policy rules shared by the build, the API and the dashboard.
+
+A rule table is a list of rules, highest priority first. Each rule has a
+label and conditions that must all hold; a condition is
+(column, op, value), where comparisons (> >= < <=) take the name of a
+threshold in THRESHOLDS and equality (== !=) takes a literal value.
+
+compile_rules() turns a table into one vectorized evaluation: every
+condition mask is computed once and np.select picks the first matching
+rule per row. Thresholds can be overridden per call, which is how the API
+re-evaluates flags under alternative cut-offs without a rebuild.
+"""
+import operator
+
+import numpy as np
+import pandas as pd
+
+THRESHOLDS = {
+    # Build-time policy flags
+    "emergency_ciim": 0.7,
+    "protect_children_ratio": 0.1,
+    "audit_growth": 0.3,
+    # Dashboard risk levels (CRITICAL shares the emergency cut-off)
+    "high_ciim": 0.5,
+    "medium_ciim": 0.3,
+    # Dashboard recommendations
+    "recommend_critical_ciim": 0.6,
+    "recommend_child_ratio": 0.3,
+    "recommend_intensity": 0.6,
+    "recommend_growth": 0.05,
+}
+
+# Priority: DATA_REVIEW > EMERGENCY > PROTECT_CHILDREN > AUDIT_EXPANSION > NORMAL
+POLICY_RULES = [
+    ("DATA_REVIEW", [("data_quality_flag", "==", "SUSPICIOUS")]),
+    ("EMERGENCY", [("CIIM", ">", "emergency_ciim")]),
+    ("PROTECT_CHILDREN", [("child_bio_ratio", ">", "protect_children_ratio")]),
+    ("AUDIT_EXPANSION", [("bio_growth", ">", "audit_growth")]),
+]
+POLICY_DEFAULT = "NORMAL"
+
+RISK_LEVEL_RULES = [
+    ("CRITICAL", [("CIIM", ">", "emergency_ciim")]),
+    ("HIGH", [("CIIM", ">", "high_ciim")]),
+    ("MEDIUM", [("CIIM", ">", "medium_ciim")]),
+]
+RISK_LEVEL_DEFAULT = "LOW"
+
+# Every matching recommendation applies, in this order
+RECOMMENDATION_RULES = [
+    ("CRITICAL_COORDINATION", [("CIIM", ">", "recommend_critical_ciim")]),
+    ("CHILD_ALTERNATIVES", [("child_bio_ratio", ">", "recommend_child_ratio")]),
+    ("ASSISTED_CENTERS", [("biometric_intensity", ">", "recommend_intensity")]),
+    ("AUDIT_EXPANSION", [("bio_growth", ">", "recommend_growth"), ("growth_direction", "==", "INCREASING")]),
+]
+
+OPERATORS = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+}
+_LITERAL_OPS = ("==", "!=")
+
+
+def resolve_thresholds(overrides=None):
+    """THRESHOLDS with `overrides` applied (None values are ignored)."""
+    thresholds = dict(THRESHOLDS)
+    for name, value in (overrides or {}).items():
+        if name not in THRESHOLDS:
+            raise ValueError(f"Unknown threshold {name!r}; expected one of {sorted(THRESHOLDS)}")
+        if value is not None:
+            thresholds[name] = float(value)
+    return thresholds
+
+
+def rule_columns(rules):
+    """Columns a rule table reads."""
+    return sorted({column for _, conditions in rules for column, _, _ in conditions})
+
+
+def compile_rules(rules, thresholds=None):
+    """
+    Compile a rule table into masks(df) -> list of one boolean array per rule.
+
+    Conditions shared between rules are evaluated once.
+    """
+    thresholds = resolve_thresholds(thresholds)
+    compiled, keys = [], {}
+    for label, conditions in rules:
+        indexes = []
+        for column, op, value in conditions:
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator {op!r} in rule {label}")
+            if op not in _LITERAL_OPS:
+                value = thresholds[value]
+            indexes.append(keys.setdefault((column, op, value), len(keys)))
+        compiled.append(indexes)
+
+    def masks(df):
+        # NaN compares False either way, as the df.loc passes did
+        evaluated = [
+            np.asarray(OPERATORS[op](df[column], value), dtype=bool)
+            for column, op, value in keys
+        ]
+        out = []
+        for indexes in compiled:
+            mask = np.ones(len(df), dtype=bool)
+            for i in indexes:
+                mask &= evaluated[i]
+            out.append(mask)
+        return out
+
+    return masks
+
+
+def evaluate(df, rules, default, thresholds=None):
+    """Label of the first matching rule per row (the highest priority), else `default`."""
+    labels = [label for label, _ in rules]
+    return np.select(compile_rules(rules, thresholds)(df), labels, default=default)
+
+
+def matching(df, rules, thresholds=None):
+    """{label: boolean mask} for every rule, for tables where all matches apply."""
+    return dict(zip((label for label, _ in rules), compile_rules(rules, thresholds)(df)))
+
+
+def policy_flags(df, thresholds=None):
+    return pd.Series(evaluate(df, POLICY_RULES, POLICY_DEFAULT, thresholds), index=df.index)
+
+
+def risk_levels(df, thresholds=None):
+    return pd.Series(evaluate(df, RISK_LEVEL_RULES, RISK_LEVEL_DEFAULT, thresholds), index=df.index)
@@ -0,0 +1,179 @@
+"""
+Per-stage instrumentation for the feature build.
+
+Each named stage records wall time, CPU time, the RSS change across the
+stage, the process peak RSS after it, and the rows it produced. The run
+report is written as JSON into the store directory, and stages that got
+noticeably slower than in the previous report are called out. One stage
+can additionally be run under cProfile; its stats are dumped next to the
+report for snakeviz/pstats.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+
+import pandas as pd
+
+REPORT_FILE = "build_report.json"
+
+# A stage is reported as a regression when it is this much slower than the
+# previous run and the slowdown is long enough to matter
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_SECONDS = 0.5
+
+
+def rss_bytes():
+    """Current RSS from /proc where available, else the peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return _peak_rss_bytes()
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rows(result):
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    if isinstance(result, (tuple, list, dict)):
+        counts = [_rows(r) for r in (result.values() if isinstance(result, dict) else result)]
+        return sum(counts) if counts and None not in counts else None
+    return None
+
+
+class StageProfiler:
+    """
+    Records named stages of one build run.
+
+    `profile_stage` names a stage to run under cProfile; its stats are
+    written to `profile_dir` (the report directory when the report is saved).
+    """
+
+    def __init__(self, profile_stage=None, profile_dir=None):
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def run(self, name, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) as stage `name` and return its result."""
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        rss = rss_bytes()
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+        stage = {
+            "stage": name,
+            "wall_s": round(time.perf_counter() - wall, 4),
+            "cpu_s": round(time.process_time() - cpu, 4),
+            "rss_delta_bytes": rss_bytes() - rss,
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "rows": _rows(result),
+        }
+        if profiler is not None:
+            stage["profile"] = self._dump_profile(name, profiler)
+        self.stages.append(stage)
+        return result
+
+    def _dump_profile(self, name, profiler):
+        directory = self.profile_dir or "."
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"build_profile_{name}.prof")
+        profiler.dump_stats(path)
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+        print(f"   🔬 cProfile of stage '{name}' saved to {path}")
+        print(out.getvalue())
+        return path
+
+    def report(self, **extra):
+        return {
+            "started_at": pd.Timestamp(self.started, unit="s", tz="UTC").isoformat(),
+            "wall_s": round(time.perf_counter() - self._wall, 4),
+            "cpu_s": round(time.process_time() - self._cpu, 4),
+            "peak_rss_bytes": _peak_rss_bytes(),
+            **extra,
+            "stages": self.stages,
+        }
+
+    def write(self, path, **extra):
+        """Write the run report into directory `path` and flag regressions against the last one."""
+        target = os.path.join(path, REPORT_FILE)
+        previous = load_report(path)
+        report = self.report(**extra)
+
+        with open(target + ".tmp", "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(target + ".tmp", target)
+
+        print_stages(report)
+        if previous is not None:
+            for line in regressions(previous, report):
+                print(f"   ⚠️  {line}")
+        print(f"   🧾 Run report: {target}")
+        return report
+
+
+def load_report(path):
+    target = os.path.join(path, REPORT_FILE)
+    if not os.path.exists(target):
+        return None
+    with open(target) as f:
+        return json.load(f)
+
+
+def stage_totals(stages):
+    """Sum repeated stages (one per batch in out-of-core builds) by name, in first-seen order."""
+    totals = {}
+    for s in stages:
+        total = totals.setdefault(s["stage"], {"stage": s["stage"], "wall_s": 0.0, "cpu_s": 0.0,
+                                                "rss_delta_bytes": 0, "rows": 0})
+        total["wall_s"] += s["wall_s"]
+        total["cpu_s"] += s["cpu_s"]
+        total["rss_delta_bytes"] += s["rss_delta_bytes"]
+        total["rows"] = None if s["rows"] is None or total["rows"] is None else total["rows"] + s["rows"]
+    return list(totals.values())
+
+
+def regressions(previous, current):
+    """Stages noticeably slower than in `previous` (matched by stage name)."""
+    before = {s["stage"]: s["wall_s"] for s in stage_totals(previous.get("stages", []))}
+    lines = []
+    for stage in stage_totals(current["stages"]):
+        old = before.get(stage["stage"])
+        if old is None:
+            continue
+        new = stage["wall_s"]
+        if new > old * REGRESSION_RATIO and new - old >= REGRESSION_MIN_SECONDS:
+            lines.append(f"Stage '{stage['stage']}' slowed from {old:.2f}s to {new:.2f}s")
+    return lines
+
+
+def print_stages(report):
+    print(f"\n   ⏱️  Build stages ({report['wall_s']:.2f}s wall, {report['cpu_s']:.2f}s CPU):")
+    for s in stage_totals(report["stages"]):
+        rows = f"{s['rows']:>12,} rows" if s["rows"] is not None else " " * 17
+        print(
+            f"      {s['stage']:<24}{s['wall_s']:>9.3f}s{s['cpu_s']:>9.3f}s cpu"
+            f"{rows}{s['rss_delta_bytes'] / 2**20:>+10.1f} MiB"
+        )
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from backend.data_access.names import canonical_state, map_names
+
+# Group keys of each materialized level (the pincode table is the base).
+# "state" is grouped on its canonical name, so every spelling of a state
+# lands in one state row and one row per district.
+LEVEL_KEYS = {
+    "district": ["date", "state", "district"],
+    "state": ["date", "state"],
+}
+
+# Policy flags from least to most severe; an aggregate carries its worst one
+POLICY_SEVERITY = ["NORMAL", "DATA_REVIEW", "AUDIT_EXPANSION", "PROTECT_CHILDREN", "EMERGENCY"]
+
+# Enrollment-weighted means
+WEIGHTED_COLUMNS = [
+    "CIIM", "biometric_intensity", "child_bio_ratio",
+    "bio_growth", "exclusion_risk", "CIIM_ACCEL",
+]
+
+SUMMED_COLUMNS = ["total_enrolled", "total_bio", "citizens_at_risk", "children_at_risk"]
+
+# Averaged over member pincodes: a district's own coordinates, a state's centroid
+GEO_COLUMNS = ["lat", "lon"]
+
+# Map level of detail: zoom -> grid cell size in degrees. Views zoomed in
+# past the last level get raw points instead of cells.
+LOD_ZOOMS = {4: 2.0, 5: 1.0, 6: 0.5, 7: 0.25, 8: 0.1}
+LOD_TABLE = "lod"
+
+
+def build_rollup(df, level):
+    """Aggregate pincode-level risk rows to one row per `level` and date."""
+    keys = LEVEL_KEYS[level]
+    weight = df["total_enrolled"].astype(np.float64)
+
+    work = df[keys].copy()
+    work["state"] = map_names(df["state"], canonical_state)
+    for col in WEIGHTED_COLUMNS:
+        work[col] = df[col] * weight
+    for col in SUMMED_COLUMNS:
+        work[col] = df[col]
+    work["_weight"] = weight
+    work["CIIM_max"] = df["CIIM"]
+    work["TTF"] = df["TTF"]
+    work["_severity"] = pd.Categorical(df["policy_flag"], categories=POLICY_SEVERITY).codes
+    work["flagged_pincodes"] = (df["data_quality_flag"] != "OK").astype(np.int64)
+    geo_columns = [c for c in GEO_COLUMNS if c in df.columns]
+    for col in geo_columns:
+        work[col] = df[col]
+
+    grouped = work.groupby(keys, observed=True, sort=True)
+    out = grouped[WEIGHTED_COLUMNS + SUMMED_COLUMNS + ["_weight", "flagged_pincodes"]].sum()
+    for col in WEIGHTED_COLUMNS:
+        out[col] = out[col] / out["_weight"]
+
+    out["CIIM"] = out["CIIM"].round(4)
+    out["CIIM_max"] = grouped["CIIM_max"].max()
+    out["TTF"] = grouped["TTF"].min()  # most urgent pincode sets the clock
+    out["policy_flag"] = np.asarray(POLICY_SEVERITY, dtype=object)[grouped["_severity"].max().clip(lower=0)]
+    out["pincodes"] = grouped.size()
+    for col in geo_columns:
+        out[col] = grouped[col].mean()
+
+    # Same thresholds as the pincode-level growth_direction
+    out["growth_direction"] = "STABLE"
+    out.loc[out["bio_growth"] > 0.05, "growth_direction"] = "INCREASING"
+    out.loc[out["bio_growth"] < -0.05, "growth_direction"] = "DECREASING"
+
+    return out.drop(columns=["_weight"]).reset_index()
+
+
+def build_lod(df):
+    """
+    Grid-binned map aggregates per date and LOD zoom: point count, mean and
+    max CIIM, people at risk, and the cell's point centroid (lat/lon).
+    """
+    located = df[df["lat"].notna() & df["lon"].notna()]
+    frames = []
+    for zoom, size in LOD_ZOOMS.items():
+        cells = pd.DataFrame({
+            "date": located["date"],
+            "zoom": zoom,
+            "cell_row": np.floor(located["lat"] / size).astype(np.int32),
+            "cell_col": np.floor(located["lon"] / size).astype(np.int32),
+            "lat": located["lat"],
+            "lon": located["lon"],
+            "CIIM": located["CIIM"],
+            "citizens_at_risk": located["citizens_at_risk"],
+        })
+        grouped = cells.groupby(["date", "zoom", "cell_row", "cell_col"], sort=True)
+        out = grouped[["lat", "lon"]].mean()
+        out["count"] = grouped.size()
+        out["CIIM_mean"] = grouped["CIIM"].mean()
+        out["CIIM_max"] = grouped["CIIM"].max()
+        out["citizens_at_risk"] = grouped["citizens_at_risk"].sum()
+        frames.append(out.reset_index())
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_rollups(df):
+    rollups = {level: build_rollup(df, level) for level in LEVEL_KEYS}
+    # Builds without a geo file carry all-NaN coordinates; they get no LOD table
+    if set(GEO_COLUMNS) <= set(df.columns) and df["lat"].notna().any():
+        rollups[LOD_TABLE] = build_lod(df)
+    return rollups
@@ -0,0 +1,78 @@
+"""
+Grouped time-series kernels for the feature pipeline.
+
+All kernels work on flat arrays already sorted by (group, time). Groups are
+described by segment offsets: rows offsets[k]:offsets[k + 1] belong to
+group k. No Python code runs per group or per row.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+
+def segment_offsets(keys):
+    """Offsets of the runs of equal consecutive values in `keys`."""
+    keys = np.asarray(keys)
+    if len(keys) == 0:
+        return np.zeros(1, dtype=np.int64)
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return np.concatenate(([0], boundaries, [len(keys)])).astype(np.int64)
+
+
+def row_segment_starts(offsets):
+    """First row of the owning segment, for every row."""
+    return np.repeat(offsets[:-1], np.diff(offsets))
+
+
+class SegmentWindowIndexer(BaseIndexer):
+    """Trailing windows of `window_size` rows that never cross a segment start."""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.row_starts)
+        return start, end
+
+
+def grouped_diff(values, offsets):
+    """values[i] - values[i - 1] within each segment, NaN on each segment's first row."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if len(values):
+        out[0] = np.nan
+        out[1:] = values[1:] - values[:-1]
+        out[offsets[:-1]] = np.nan
+    return out
+
+
+def grouped_rolling_mean(values, offsets, window, min_periods=1):
+    """
+    Trailing rolling mean within each segment.
+
+    Runs pandas' compiled rolling-mean kernel once over the whole column;
+    the window bounds restart at every segment, which makes the kernel reset
+    its running sum exactly as a per-group `rolling(window).mean()` would.
+    That running sum carries rounding from rows that already left the
+    window, so a segment must be passed from its first row to reproduce the
+    per-group result bit for bit.
+    """
+    indexer = SegmentWindowIndexer(window_size=window, row_starts=row_segment_starts(offsets))
+    series = pd.Series(np.asarray(values, dtype=np.float64))
+    return series.rolling(indexer, min_periods=min_periods).mean().to_numpy()
+
+
+def grouped_trend(values, offsets, window=3, min_periods=2, rise=1.1, fall=0.9):
+    """
+    Trend of each trailing window within a segment: 1 if the last value is
+    above `rise` x the first, -1 if below `fall` x the first, else 0.
+    NaN where the window holds fewer than `min_periods` observations.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows = np.arange(len(values))
+    first_row = np.maximum(rows - (window - 1), row_segment_starts(offsets))
+
+    observed = np.concatenate(([0], np.cumsum(~np.isnan(values))))
+    nobs = observed[rows + 1] - observed[first_row]
+
+    first = values[first_row]
+    trend = np.where(values > first * rise, 1.0, np.where(values < first * fall, -1.0, 0.0))
+    return np.where(nobs >= min_periods, trend, np.nan)